@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_headline(headline: str) -> str:
+    """Normalizes a headline so trivial edits (case, quotes, spacing) map to the same key."""
+    text = unicodedata.normalize("NFKC", headline or "").casefold()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class AnalysisCache:
+    """
+    Disk-backed cache of Groq headline analyses.
+    Keys are a hash of the normalized headline plus the model and prompt version,
+    so changing either invalidates old entries. Entries expire after `ttl_seconds`
+    and the least recently used ones are evicted beyond `max_entries`.
+    Entries persist to the SQLite `store` when given; the JSON file at `path` is then only
+    read once to migrate older deployments.
+    """
+
+    def __init__(self, path: str, namespace: str, ttl_seconds: float, max_entries: int, store=None):
+        self.path = path
+        self.store = store
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> {"result": {...}, "stored_at": float}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _key(self, headline: str) -> str:
+        raw = f"{self.namespace}\n{normalize_headline(headline)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, headline: str):
+        """Returns a copy of the cached analysis for `headline`, or None on miss/expiry."""
+        key = self._key(headline)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry["stored_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry["result"])
+
+    def put(self, headline: str, result: dict):
+        key = self._key(headline)
+        with self._lock:
+            self._entries[key] = {"result": dict(result), "stored_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def _restore(self, stored_entries, dirty):
+        now = time.time()
+        with self._lock:
+            self._entries.clear()
+            # Stored oldest-used first, so insertion order restores the LRU order
+            for key, entry in stored_entries:
+                if now - entry.get("stored_at", 0) <= self.ttl_seconds:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = dirty
+
+    def load(self):
+        """Loads entries from the store (or disk), dropping expired ones. Missing/corrupt data starts empty."""
+        if self.store is not None:
+            try:
+                stored_entries = self.store.load_analyses(self.namespace)
+            except (sqlite3.Error, ValueError) as e:
+                logging.warning(f"Analysis cache: could not read the store, starting empty: {e}")
+                stored_entries = []
+            if stored_entries:
+                self._restore(stored_entries, dirty=False)
+                logging.info(f"Analysis cache: loaded {len(self._entries)} entries from the store.")
+                return
+            # Nothing stored yet: migrate the JSON file, written to the store on the next save
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Analysis cache: could not read {self.path}, starting empty: {e}")
+            return
+        if stored.get("namespace") != self.namespace:
+            logging.info("Analysis cache: model/prompt version changed, discarding stored entries.")
+            return
+        self._restore(stored.get("entries", []), dirty=self.store is not None)
+        logging.info(f"Analysis cache: loaded {len(self._entries)} entries from {self.path}.")
+
+    def save(self):
+        """Atomically writes the cache to the store (or disk) if it changed since the last save/load."""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._entries.items())
+            self._dirty = False
+        try:
+            if self.store is not None:
+                self.store.replace_analyses(self.namespace, entries)
+            else:
+                self._save_json({"namespace": self.namespace, "entries": entries})
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Analysis cache: failed to save: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def _save_json(self, payload):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".analysis_cache.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
@@ -1,20 +1,58 @@
-from fastapi import FastAPI
-from ndtv import scrape_ndtv_news
-from aninews import scrape_ani_news
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from crawler import CrawlError, crawl_source
+from sources import SOURCES
+from driver import get_driver_pool
 import time
 import threading
-import random
-from groq import Groq
+from groq import Groq, BadRequestError, RateLimitError, APIConnectionError, InternalServerError
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from rate_limiter import RateLimiter
+from scheduler import RefreshScheduler
+from analysis_cache import AnalysisCache
+from gazetteer import extract_location
+from near_duplicates import StoryIndex, cluster_headlines
+from items import diff_listing, item_id, item_timestamp
+from news_cache import InvalidCursor, NewsCache, build_snapshot, query_snapshot, snapshot_changes
+from responses import ResponseCache
+from change_feed import ChangeFeed, LONG_POLL_TIMEOUT_SECONDS, SSE_HEARTBEAT_SECONDS
+from metrics import (CACHE_AGE_SECONDS, CACHE_ITEMS, GROQ_FALLBACKS, GROQ_RATE_LIMITED, GROQ_REQUEST_SECONDS, GROQ_TOKENS,
+                     HEADLINES_ANALYZED, SCRAPE_ERRORS, SCRAPE_SECONDS, SCRAPED_ITEMS, RequestLatencyMiddleware, render_latest)
+from store import get_news_store, ITEM_RETENTION_SECONDS, STORE_PATH
+from leader import LeaderLock
 import os
+import asyncio
 import json
 import logging
-import uuid
+import sqlite3
+from datetime import date, datetime, timedelta
+from functools import partial
 
 # --- Configuration ---
-CACHE_UPDATE_INTERVAL_SECONDS = 920
 GROQ_API_KEY = os.environ.get("api_key")
 GROQ_MODEL = "llama3-8b-8192"
-GROQ_REQUEST_DELAY_SECONDS = 2.2 # Safety buffer for 30 RPM
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL") or None # Override the API endpoint, e.g. a local stand-in for benchmarks
+# "auto": workers elect one refresher via REFRESHER_LOCK_PATH, the others follow the shared store;
+# "follower": never refresh (API workers next to refresher.py); "off": neither (benchmarks, tools)
+REFRESH_MODE = os.environ.get("REFRESH_MODE", "auto")
+REFRESHER_LOCK_PATH = os.environ.get("REFRESHER_LOCK_PATH", f"{STORE_PATH}.refresher.lock")
+SHARED_CACHE_POLL_SECONDS = 2 # How often followers check the shared store for a newer snapshot
+GROQ_REQUESTS_PER_MINUTE = 30
+GROQ_TOKENS_PER_MINUTE = 30000
+GROQ_MAX_CONCURRENCY = 4 # In-flight Groq requests; the limiter keeps them within the per-minute budgets
+GROQ_MAX_RETRIES = 4 # Retries per request on 429/5xx/connection errors
+NEWS_SOURCES = {spec.name: partial(crawl_source, spec) for spec in SOURCES} # Declared in sources.py; scraped in parallel
+SOURCE_KEYS = {spec.name: spec.key for spec in SOURCES} # Metric labels, shared with the crawler's series
+SOURCE_SCRAPE_TIMEOUT_SECONDS = {spec.name: spec.scrape_timeout_seconds for spec in SOURCES}
+DEFAULT_SOURCE_SCRAPE_TIMEOUT_SECONDS = 180
+SOURCE_MIN_REFRESH_INTERVAL_SECONDS = {spec.name: spec.min_refresh_interval_seconds for spec in SOURCES
+                                       if spec.min_refresh_interval_seconds is not None} # Floors for the adaptive scheduler
+GROQ_BATCH_SIZE = 20 # Headlines classified per chat completion
+GROQ_PROMPT_VERSION = 3 # Bump whenever the analysis prompt changes to invalidate cached results
+ANALYSIS_CACHE_PATH = os.environ.get("ANALYSIS_CACHE_PATH", "analysis_cache.json")
+ANALYSIS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+ANALYSIS_CACHE_MAX_ENTRIES = 5000
+MAX_PAGE_SIZE = 200 # Upper bound for /new?limit=
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,235 +64,834 @@ if not GROQ_API_KEY:
     logging.error("GROQ_API_KEY environment variable not set. Cannot analyze news.")
 else:
     try:
-        groq_client = Groq(api_key=GROQ_API_KEY, timeout=30.0)
+        # Retries are handled by _groq_chat_completion so they go through the shared rate limiter
+        groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, timeout=30.0, max_retries=0)
         logging.info("Groq client initialized successfully.")
     except Exception as e:
         logging.error(f"Failed to initialize Groq client: {e}")
         groq_client = None
 
+groq_rate_limiter = RateLimiter(GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE)
+groq_executor = ThreadPoolExecutor(max_workers=GROQ_MAX_CONCURRENCY, thread_name_prefix="groq")
+
+# --- Persistent Store (SQLite, WAL) ---
+news_store = get_news_store()
+
+# --- Headline Analysis Cache ---
+analysis_cache = AnalysisCache(
+    path=ANALYSIS_CACHE_PATH,
+    namespace=f"{GROQ_MODEL}:v{GROQ_PROMPT_VERSION}",
+    ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    store=news_store,
+)
+analysis_cache.load()
+story_index = StoryIndex() # Recently classified headlines, matched by near-duplicate similarity
+
 # --- FastAPI App ---
 app = FastAPI()
-cached_news = None # Will store {"data": [...]}
-cache_lock = threading.Lock()
-fetch_lock = threading.Lock()
+news_cache = NewsCache() # Published crime items; refreshed item by item during each cycle
+response_cache = ResponseCache() # Pre-encoded /new bodies, built once per news_cache version
+change_feed = ChangeFeed() # Recent upserts/removals of the shared snapshot, for /new/changes and /new/stream
+
+def _update_cache_gauges():
+    snapshot = news_cache.snapshot()
+    CACHE_AGE_SECONDS.set(time.time() - snapshot.updated_at if snapshot.updated_at else 0.0)
+    CACHE_ITEMS.set(len(snapshot.data))
+
+app.add_middleware(RequestLatencyMiddleware, paths=["/new"])
+# Adaptive per-source refresh times; only the refresher runs it, followers read it from the store
+refresh_scheduler = RefreshScheduler(NEWS_SOURCES, store=news_store, min_intervals=SOURCE_MIN_REFRESH_INTERVAL_SECONDS,
+                                     metric_labels=SOURCE_KEYS)
+
+# Warm start: serve the items published before the last restart until the first cycle replaces them
+try:
+    boot_start = time.time()
+    shared_version, shared_updated_at, shared_records = news_store.load_shared_snapshot()
+    loaded = news_cache.load(shared_records, version=shared_version or None, updated_at=shared_updated_at or None)
+    change_feed.extend(news_store.load_changes(0, shared_version))
+    logging.info(f"Loaded {loaded} published items from the store in {(time.time() - boot_start) * 1000:.1f}ms.")
+except sqlite3.Error as e:
+    logging.error(f"Could not load published items from the store, starting cold: {e}")
+previous_listings = {} # source_name -> {item id: raw item} of the last analyzed listing
+shared_published = None # source_name -> entries in the shared snapshot, as the refresher last committed them
+shared_snapshot = None # What followers serve from shared_published
+shared_commit_lock = threading.Lock() # Sources finish concurrently; their commits (and change log) go in order
+refresher_lock = LeaderLock(REFRESHER_LOCK_PATH) # Held by the one process that scrapes
+
+# --- Helper Function: Rate-Limited Groq Chat Completion ---
+def _retry_after_seconds(error: RateLimitError, attempt: int) -> float:
+    """Reads Retry-After from a 429 response, falling back to exponential backoff."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                pass # HTTP-date form, fall through to the default
+    return min(60.0, 2.0 ** (attempt + 1))
+
+def _groq_chat_completion(prompt: str, client: Groq, expected_output_tokens: int) -> str:
+    """
+    Sends one JSON-mode chat completion through `groq_rate_limiter` and returns the message content.
+    429s pause all callers for the server's Retry-After; 5xx and connection errors are retried
+    with exponential backoff. Raises the last error once GROQ_MAX_RETRIES is exhausted.
+    """
+    # Rough estimate (~4 chars per token); corrected with the real usage after the call
+    estimated_tokens = len(prompt) // 4 + expected_output_tokens
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        groq_rate_limiter.acquire(estimated_tokens)
+        request_start = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=GROQ_MODEL,
+                temperature=0.1,
+                response_format={"type": "json_object"},
+            )
+        except RateLimitError as e:
+            GROQ_REQUEST_SECONDS.labels("rate_limited").observe(time.perf_counter() - request_start)
+            GROQ_RATE_LIMITED.inc()
+            if attempt == GROQ_MAX_RETRIES: raise
+            groq_rate_limiter.backoff(_retry_after_seconds(e, attempt))
+            continue
+        except (APIConnectionError, InternalServerError) as e:
+            GROQ_REQUEST_SECONDS.labels("error").observe(time.perf_counter() - request_start)
+            if attempt == GROQ_MAX_RETRIES: raise
+            logging.warning(f"Groq request failed ({e}), retrying (attempt {attempt + 1}/{GROQ_MAX_RETRIES}).")
+            time.sleep(min(30.0, 2.0 ** attempt))
+            continue
+        GROQ_REQUEST_SECONDS.labels("ok").observe(time.perf_counter() - request_start)
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            groq_rate_limiter.record_usage(estimated_tokens, usage.total_tokens)
+            GROQ_TOKENS.labels("prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+            GROQ_TOKENS.labels("completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+        return response.choices[0].message.content.strip()
+
+# --- Helper Function: Remember a Groq Classification ---
+def _remember_analysis(headline: str, classification: dict):
+    """Caches a valid classification by exact headline and indexes it for near-duplicates."""
+    analysis_cache.put(headline, classification)
+    story_index.add(headline, classification)
+
+# --- Helper Function: Validate a Single Classification Object ---
+def _validate_analysis(analysis_data) -> dict | None:
+    """Returns a normalized {"is_crime", "crime_type"} dict, or None if the shape is wrong."""
+    if not isinstance(analysis_data, dict):
+        return None
+    if not (isinstance(analysis_data.get("is_crime"), bool) and
+            isinstance(analysis_data.get("crime_type"), str)):
+        return None
+    result = {"is_crime": analysis_data["is_crime"], "crime_type": analysis_data["crime_type"]}
+    # Ensure consistency: if not crime, type should be N/A
+    if not result["is_crime"]:
+        result["crime_type"] = "N/A"
+    return result
+
+# --- Helper Function: Attach Gazetteer Location ---
+def _with_location(headline: str, classification: dict) -> dict:
+    """
+    Adds the "location" key from the local Delhi NCR gazetteer.
+    Crime headlines without a specific match fall back to "Delhi"; non-crime ones get "N/A".
+    """
+    result = dict(classification)
+    if result.get("is_crime"):
+        result["location"] = extract_location(headline) or "Delhi"
+    else:
+        result["location"] = "N/A"
+    return result
 
 # --- Helper Function: Analyze Headline with Groq (Combined) ---
 def analyze_headline_with_groq(headline: str, client: Groq) -> dict:
     """
-    Uses Groq API to determine if headline is crime-related AND extracts location/type.
+    Uses Groq API to determine if headline is crime-related and its crime type; the location
+    comes from the local gazetteer (see _with_location).
     Returns a dictionary: {"is_crime": bool, "location": str, "crime_type": str}
     Uses "N/A" for location/type if not applicable or not found.
+    Valid classifications are stored in `analysis_cache`; errors are not cached so they are retried next cycle.
     """
     # Default result ensures keys exist, uses "N/A" for non-crime/errors
     default_result = {"is_crime": False, "location": "N/A", "crime_type": "N/A"}
     if not client or not headline:
         logging.warning("Skipping Groq analysis: No client or empty headline.")
+        GROQ_FALLBACKS.labels("no_client").inc()
         return default_result
 
-    # Updated prompt to clarify output expectations for non-crime cases
+    # Locations are extracted locally, so the model only classifies
     prompt = f"""
     Analyze the following news headline. Determine if it is related to a CRIME (e.g., theft, assault, murder, scam, arrest, police investigation, illegal activity, court proceedings related to crime etc.).
-    Also, extract the most precise LOCATION mentioned within the DELHI NCR area. If no specific Delhi NCR location is mentioned BUT the headline IS crime-related, use "Delhi".
     Strictly identify the CRIME TYPE if it is a crime-related headline.
 
     Headline: '{headline}'
 
     Return ONLY a valid JSON object with the following keys:
     - "is_crime": boolean (true if crime-related, false otherwise)
-    - "location": string (extracted Delhi NCR location, or "Delhi" if crime-related but non-specific, otherwise "N/A")
     - "crime_type": string (identified crime type if is_crime is true, otherwise "N/A")
 
-    Example 1 (Crime, Specific Loc): {{"is_crime": true, "location": "Rohini", "crime_type": "Murder"}}
-    Example 2 (Not Crime): {{"is_crime": false, "location": "N/A", "crime_type": "N/A"}}
-    Example 3 (Crime, Non-Specific Loc): {{"is_crime": true, "location": "Delhi", "crime_type": "Theft"}}
+    Example 1 (Crime): {{"is_crime": true, "crime_type": "Murder"}}
+    Example 2 (Not Crime): {{"is_crime": false, "crime_type": "N/A"}}
 
     Ensure the output is ONLY the JSON object. Do not include any explanations or surrounding text.
     """
     try:
         logging.debug(f"Calling Groq for analysis: '{headline[:50]}...'")
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=GROQ_MODEL,
-            temperature=0.1,
-            response_format={"type": "json_object"},
-        )
-        result_content = response.choices[0].message.content.strip()
+        result_content = _groq_chat_completion(prompt, client, expected_output_tokens=25)
         logging.debug(f"Groq analysis raw response for '{headline[:50]}...': {result_content}")
 
         try:
-            analysis_data = json.loads(result_content)
-            # Basic validation
-            if isinstance(analysis_data.get("is_crime"), bool) and \
-               isinstance(analysis_data.get("location"), str) and \
-               isinstance(analysis_data.get("crime_type"), str):
-                 # Ensure consistency: if not crime, location/type should be N/A
-                 if not analysis_data["is_crime"]:
-                     analysis_data["location"] = "N/A"
-                     analysis_data["crime_type"] = "N/A"
-                 return analysis_data
+            analysis_data = _validate_analysis(json.loads(result_content))
+            if analysis_data is not None:
+                 _remember_analysis(headline, analysis_data)
+                 return _with_location(headline, analysis_data)
             else:
                 logging.warning(f"Groq response JSON has invalid structure/types: {result_content}")
+                GROQ_FALLBACKS.labels("invalid_response").inc()
                 return default_result
         except json.JSONDecodeError:
             logging.error(f"Failed to parse JSON from Groq: {result_content}")
+            GROQ_FALLBACKS.labels("invalid_response").inc()
             return default_result
 
+    except RateLimitError:
+        logging.warning(f"Groq still rate limited after {GROQ_MAX_RETRIES} retries for '{headline[:50]}...'. Not cached; will retry next cycle.")
+        GROQ_FALLBACKS.labels("rate_limited").inc()
+        return default_result
     except Exception as e:
         logging.error(f"Error during Groq analysis for '{headline[:50]}...': {e}", exc_info=False)
+        GROQ_FALLBACKS.labels("error").inc()
         return default_result
 
-# --- Core Logic: Fetch, Analyze, Filter News ---
-def fetch_analyze_and_filter_news():
-    """Fetches raw news, analyzes with Groq, filters for crime, returns structured data."""
-    logging.info("Starting news fetch, analysis, and filter process...")
-    # ... (Scraping logic for raw_ndtv_data and raw_ani_data remains the same) ...
-    raw_ndtv_data = []
-    raw_ani_data = []
-    try:
-        logging.info("Scraping NDTV...")
-        raw_ndtv_data = scrape_ndtv_news().get("data", [])
-        logging.info(f"Scraped {len(raw_ndtv_data)} raw items from NDTV.")
-    except Exception as e: logging.error(f"Error scraping NDTV: {e}", exc_info=True)
-    try:
-        logging.info("Scraping ANI News...")
-        raw_ani_data = scrape_ani_news().get("data", [])
-        logging.info(f"Scraped {len(raw_ani_data)} raw items from ANI News.")
-    except Exception as e: logging.error(f"Error scraping ANI: {e}", exc_info=True)
+# --- Helper Function: Analyze a Batch of Headlines with Groq ---
+def _request_batch_analysis(headlines: list, client: Groq) -> dict:
+    """
+    Sends one chat completion classifying all `headlines`.
+    Returns {index: classification} for every entry that came back well-formed; missing or
+    malformed entries are simply absent so the caller can retry them.
+    """
+    numbered = "\n".join(f"{i}. '{h}'" for i, h in enumerate(headlines))
+    prompt = f"""
+    Analyze each of the following numbered news headlines. For each one, determine if it is related to a CRIME (e.g., theft, assault, murder, scam, arrest, police investigation, illegal activity, court proceedings related to crime etc.).
+    Strictly identify the CRIME TYPE if it is a crime-related headline.
 
-    all_raw_data = raw_ndtv_data + raw_ani_data
-    logging.info(f"Total raw items scraped: {len(all_raw_data)}")
+    Headlines:
+    {numbered}
 
-    if not all_raw_data: return {"data": []} # Return correct empty structure
-    if not groq_client:
-        logging.warning("Groq client not available. Cannot provide analyzed news.")
-        return {"data": []} # Return correct empty structure
+    Return ONLY a valid JSON object with a single key "results" holding an array with exactly one entry per headline. Each entry has the keys:
+    - "index": integer (the headline's number above)
+    - "is_crime": boolean (true if crime-related, false otherwise)
+    - "crime_type": string (identified crime type if is_crime is true, otherwise "N/A")
 
-    logging.info(f"Analyzing {len(all_raw_data)} headlines with Groq (delay: {GROQ_REQUEST_DELAY_SECONDS}s)...")
-    filtered_news_items = []
-    analysis_start_time = time.time()
+    Example: {{"results": [{{"index": 0, "is_crime": true, "crime_type": "Murder"}}, {{"index": 1, "is_crime": false, "crime_type": "N/A"}}]}}
 
-    for i, raw_item in enumerate(all_raw_data):
-        headline = raw_item.get("content")
-        if not headline or not headline.strip(): continue
+    Ensure the output is ONLY the JSON object. Do not include any explanations or surrounding text.
+    """
+    result_content = _groq_chat_completion(prompt, client, expected_output_tokens=25 * len(headlines))
+    logging.debug(f"Groq batch analysis raw response ({len(headlines)} headlines): {result_content}")
 
-        logging.debug(f"Waiting {GROQ_REQUEST_DELAY_SECONDS}s before Groq call {i+1}/{len(all_raw_data)}")
-        time.sleep(GROQ_REQUEST_DELAY_SECONDS)
+    try:
+        entries = json.loads(result_content).get("results")
+    except (json.JSONDecodeError, AttributeError):
+        logging.warning(f"Groq batch response was not a JSON object ({len(headlines)} headlines).")
+        return {}
+    if not isinstance(entries, list):
+        logging.warning(f"Groq batch response has no 'results' array ({len(headlines)} headlines).")
+        return {}
+
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict): continue
+        index = entry.get("index")
+        # bool is an int subclass, so reject it explicitly
+        if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(headlines):
+            continue
+        analysis = _validate_analysis(entry)
+        if analysis is not None and index not in results:
+            results[index] = analysis
+    return results
+
+def _groq_error_code(error: BadRequestError):
+    """The "code" of a Groq error response body ({"error": {"code": ...}}), or None."""
+    body = error.body if isinstance(error.body, dict) else {}
+    details = body.get("error", body)
+    return details.get("code") if isinstance(details, dict) else None
+
+def analyze_headlines_batch_with_groq(headlines: list, client: Groq) -> list:
+    """
+    Classifies several headlines per Groq request.
+    Returns a list of analysis dicts aligned with `headlines`. Entries missing from a
+    malformed or partial response are retried by splitting the batch in half; a
+    single leftover headline falls back to `analyze_headline_with_groq`.
+    Every request goes through the shared `groq_rate_limiter`, so this is safe to call from several threads.
+    """
+    if not headlines:
+        return []
+    if len(headlines) == 1:
+        return [analyze_headline_with_groq(headlines[0], client)]
+
+    try:
+        batch_results = _request_batch_analysis(headlines, client)
+    except RateLimitError:
+        logging.warning(f"Groq still rate limited after {GROQ_MAX_RETRIES} retries ({len(headlines)} headlines). Not cached; will retry next cycle.")
+        GROQ_FALLBACKS.labels("rate_limited").inc(len(headlines))
+        return [{"is_crime": False, "location": "N/A", "crime_type": "N/A"} for _ in headlines]
+    except BadRequestError as e:
+        if _groq_error_code(e) != "json_validate_failed":
+            # Any other 400 (bad model, bad request) would fail the halves too, so don't split
+            logging.error(f"Groq rejected the batch request ({len(headlines)} headlines): {e}")
+            GROQ_FALLBACKS.labels("error").inc(len(headlines))
+            return [{"is_crime": False, "location": "N/A", "crime_type": "N/A"} for _ in headlines]
+        # JSON mode rejects malformed model output with a 400; smaller batches usually pass
+        logging.warning(f"Groq rejected the batch output as invalid JSON ({len(headlines)} headlines). Splitting the batch.")
+        batch_results = {}
+    except Exception as e:
+        # Request-level failures (network, quota) would fail the halves too, so don't split
+        logging.error(f"Error during Groq batch analysis ({len(headlines)} headlines): {e}", exc_info=False)
+        GROQ_FALLBACKS.labels("error").inc(len(headlines))
+        return [{"is_crime": False, "location": "N/A", "crime_type": "N/A"} for _ in headlines]
+
+    for index, analysis in batch_results.items():
+        _remember_analysis(headlines[index], analysis)
+        batch_results[index] = _with_location(headlines[index], analysis)
+
+    missing = [i for i in range(len(headlines)) if i not in batch_results]
+    if missing:
+        logging.warning(f"Groq batch returned {len(batch_results)}/{len(headlines)} valid results. Splitting {len(missing)} leftovers.")
+        half = (len(missing) + 1) // 2
+        for chunk in (missing[:half], missing[half:]):
+            if not chunk: continue
+            # Each retry is at most half the size, so recursion always terminates
+            retried = analyze_headlines_batch_with_groq([headlines[i] for i in chunk], client)
+            for i, analysis in zip(chunk, retried):
+                batch_results[i] = analysis
+
+    return [batch_results[i] for i in range(len(headlines))]
+
+# --- Helper Function: Format a Crime Item ---
+def _format_entry(raw_item: dict, analysis_result: dict) -> dict:
+    """Builds the final dictionary matching the target format."""
+    return {
+        "content": raw_item.get("content", "N/A"),
+        "date": raw_item.get("date", "N/A"), # Ensure scraper provides this format
+        "id": raw_item.get("id") or item_id(raw_item.get("url", "")), # Use ID from scraper
+        "imageUrl": raw_item.get("imageUrl", "N/A"),
+        "readMoreUrl": raw_item.get("readMoreUrl", "N/A"),
+        "time": raw_item.get("time", "N/A"), # Ensure scraper provides this format
+        "url": raw_item.get("url", "N/A"),
+        # Get type/location from analysis, defaulting to "N/A"
+        "type": analysis_result.get("crime_type", "N/A"),
+        "location": analysis_result.get("location", "N/A")
+    }
+
+# --- Core Logic: Analyze and Filter One Source's Items ---
+def analyze_and_filter_items(all_raw_data: list, source_name: str, publish=None) -> list:
+    """
+    Analyzes raw scraped items with Groq (via the analysis cache) and returns only the crime-related ones, formatted, newest first.
+    Headlines are analyzed newest first, and `publish(entry)` (if given) is called for each crime
+    item as soon as its analysis is known, so readers don't wait for the whole source.
+    """
+    if not all_raw_data: return []
+    if not groq_client:
+        logging.warning(f"Groq client not available. Cannot analyze {source_name} news.")
+        GROQ_FALLBACKS.labels("no_client").inc(len(all_raw_data))
+        return []
 
-        analysis_result = analyze_headline_with_groq(headline, groq_client)
+    logging.info(f"Analyzing {len(all_raw_data)} {source_name} headlines with Groq (batch size: {GROQ_BATCH_SIZE}, concurrency: {GROQ_MAX_CONCURRENCY})...")
+    analysis_start_time = time.time()
+    # Stable sort: items without a parseable date keep their listing order, after dated ones
+    order = sorted(range(len(all_raw_data)), key=lambda i: item_timestamp(all_raw_data[i]), reverse=True)
+    analysis_results = {} # index in all_raw_data -> analysis dict
 
+    def accept(i, analysis_result):
+        analysis_results[i] = analysis_result
         # *** Only include CRIME-related news in the final output ***
         if analysis_result.get("is_crime"):
+            headline = all_raw_data[i].get("content")
             logging.info(f"CRIME DETECTED: '{headline[:80]}...' -> Type: {analysis_result.get('crime_type')}, Loc: {analysis_result.get('location')}")
-            # Build the final dictionary matching the target format
-            formatted_entry = {
-                "content": raw_item.get("content", "N/A"),
-                "date": raw_item.get("date", "N/A"), # Ensure scraper provides this format
-                "id": raw_item.get("id", str(uuid.uuid4())), # Use ID from scraper
-                "imageUrl": raw_item.get("imageUrl", "N/A"),
-                "readMoreUrl": raw_item.get("readMoreUrl", "N/A"),
-                "time": raw_item.get("time", "N/A"), # Ensure scraper provides this format
-                "url": raw_item.get("url", "N/A"),
-                # Get type/location from analysis, defaulting to "N/A"
-                "type": analysis_result.get("crime_type", "N/A"),
-                "location": analysis_result.get("location", "N/A")
-            }
-            filtered_news_items.append(formatted_entry)
-        # else: # No need to log non-crime here if only crime items are kept
-            # logging.debug(f"NON-CRIME: '{headline[:80]}...'")
+            if publish is not None:
+                publish(_format_entry(all_raw_data[i], analysis_result))
 
+    # Headlines seen in earlier cycles are served from the cache without touching Groq
+    pending = [] # indices that still need Groq, newest first
+    for i in order:
+        headline = all_raw_data[i].get("content")
+        if not headline or not headline.strip(): continue
+        cached = analysis_cache.get(headline)
+        if cached is not None:
+            accept(i, _with_location(headline, cached))
+        else:
+            pending.append(i)
+    cache_hits = len(analysis_results)
+
+    # Near-duplicates of recently classified headlines (often the other source's copy of a story) reuse that label
+    unmatched = []
+    for i in pending:
+        headline = all_raw_data[i]["content"]
+        classification = story_index.find(headline)
+        if classification is not None:
+            analysis_cache.put(headline, classification)
+            accept(i, _with_location(headline, classification))
+        else:
+            unmatched.append(i)
+    # The rest are clustered; only each cluster's newest headline goes to Groq and its label is propagated
+    clusters = [[unmatched[j] for j in cluster]
+                for cluster in cluster_headlines([all_raw_data[i]["content"] for i in unmatched])]
+    cluster_members = {cluster[0]: cluster[1:] for cluster in clusters}
+    representatives = [cluster[0] for cluster in clusters]
+    propagated = len(pending) - len(representatives)
+    HEADLINES_ANALYZED.labels("cache").inc(cache_hits)
+    HEADLINES_ANALYZED.labels("near_duplicate").inc(propagated)
+    HEADLINES_ANALYZED.labels("groq").inc(len(representatives))
+
+    # Batches run concurrently on the shared Groq executor; groq_rate_limiter keeps them inside the RPM/TPM budgets.
+    # They are submitted newest first and published in completion order.
+    batches = [representatives[start:start + GROQ_BATCH_SIZE] for start in range(0, len(representatives), GROQ_BATCH_SIZE)]
+    batch_futures = {
+        groq_executor.submit(analyze_headlines_batch_with_groq, [all_raw_data[i]["content"] for i in batch_indices], groq_client): batch_indices
+        for batch_indices in batches
+    }
+    for future in as_completed(batch_futures):
+        for i, analysis in zip(batch_futures[future], future.result()):
+            accept(i, analysis)
+            if not cluster_members[i]: continue
+            # Only a real Groq answer (remembered in story_index) is cached for the members too
+            remembered = story_index.find(all_raw_data[i]["content"])
+            classification = {"is_crime": analysis.get("is_crime"), "crime_type": analysis.get("crime_type")}
+            for j in cluster_members[i]:
+                if remembered is not None:
+                    analysis_cache.put(all_raw_data[j]["content"], remembered)
+                accept(j, _with_location(all_raw_data[j]["content"], classification))
+
+    filtered_news_items = [_format_entry(all_raw_data[i], analysis_results[i])
+                           for i in order if analysis_results.get(i, {}).get("is_crime")]
 
     analysis_end_time = time.time()
-    logging.info(f"Groq analysis complete ({analysis_end_time - analysis_start_time:.2f}s). Found {len(filtered_news_items)} crime items.")
+    logging.info(f"{source_name}: Groq analysis complete ({analysis_end_time - analysis_start_time:.2f}s). Found {len(filtered_news_items)} crime items.")
+    logging.info(f"{source_name}: Analysis cache: {cache_hits} hits, {propagated} labels from near-duplicates, {len(representatives)} headlines sent to Groq.")
+    return filtered_news_items
 
-    random.shuffle(filtered_news_items)
+def _previous_listing(source_name: str) -> dict:
+    """The source's last analyzed listing by item ID, read from the store after a restart."""
+    if source_name not in previous_listings:
+        try:
+            previous_listings[source_name] = {item["id"]: item for item in news_store.load_latest_listing(source_name)}
+        except sqlite3.Error as e:
+            logging.error(f"{source_name}: Could not load the previous listing, treating every item as added: {e}")
+            return {}
+    return previous_listings[source_name]
+
+def _analyze_and_publish(raw_data: list, source_name: str) -> list:
+    """
+    Diffs one source's listing against the previous cycle and analyzes only the added items
+    into `news_cache`. Unchanged items keep their published state; removed ones are dropped.
+    The scraped listing and the published set are persisted to `news_store`.
+    """
+    diff = diff_listing(_previous_listing(source_name), raw_data)
+    refresh_scheduler.observe(source_name, len(diff.added)) # Publication rate sample for the scheduler
+    # Unchanged items without a stored analysis (e.g. rate limited last cycle) are retried
+    retried = [item for item in diff.unchanged if analysis_cache.get(item["content"]) is None]
+    retried_ids = {item["id"] for item in retried}
+    logging.info(f"{source_name}: {len(diff.added)} added, {len(diff.unchanged)} unchanged "
+                 f"({len(retried)} retried), {len(diff.removed)} removed since the last cycle.")
+    try:
+        news_store.upsert_items(source_name, raw_data)
+    except sqlite3.Error as e:
+        logging.error(f"{source_name}: Failed to store scraped items: {e}")
+
+    filtered_news_items = analyze_and_filter_items(diff.added + retried, source_name,
+                                                   publish=lambda entry: news_cache.publish(entry, source_name))
+    keep_urls = [entry["url"] for entry in filtered_news_items]
+    keep_urls += [item["url"] for item in diff.unchanged if item["id"] not in retried_ids]
+    removed = news_cache.retain(source_name, keep_urls)
+    if removed:
+        logging.info(f"{source_name}: Removed {removed} items no longer listed as crime.")
+    previous_listings[source_name] = {item["id"]: item for item in raw_data}
+    published = news_cache.entries(source_name)
+    try:
+        # Also advances the shared snapshot that API workers in other processes follow
+        _commit_shared(source_name, published)
+    except sqlite3.Error as e:
+        logging.error(f"{source_name}: Failed to store published items: {e}")
+    return published
+
+def _commit_shared(source_name: str, published: list):
+    """
+    Persists `source_name`'s published items as the next shared version, together with the changes
+    they make to what followers serve. The change feed of every worker (this one included) replays
+    that log, so feed cursors are the same everywhere and only cover committed versions.
+    Shared versions count commits, not news_cache versions: two sources finishing without a publish
+    in between still get two versions, and our own snapshot runs ahead of the shared one mid-cycle.
+    """
+    global shared_published, shared_snapshot
+    with shared_commit_lock:
+        if shared_published is None:
+            version, updated_at, records = news_store.load_shared_snapshot()
+            shared_published = {}
+            for record_source, entry in records:
+                shared_published.setdefault(record_source, []).append(entry)
+            shared_snapshot = build_snapshot(version, records, updated_at)
+        records = [(record_source, entry) for record_source, entries in shared_published.items()
+                   if record_source != source_name for entry in entries]
+        records += [(source_name, entry) for entry in published]
+        snapshot = build_snapshot(shared_snapshot.version + 1, records)
+        logged = news_store.set_published(source_name, published, version=snapshot.version,
+                                          changes=snapshot_changes(shared_snapshot, snapshot))
+        shared_published[source_name] = published
+        shared_snapshot = snapshot
+    change_feed.extend(logged)
+
+
+# --- Core Logic: Fetch, Analyze, Filter News ---
+def fetch_analyze_and_filter_news(source_names=None, on_source_done=None):
+    """
+    Fetches raw news, analyzes with Groq, filters for crime, and publishes into `news_cache`.
+    Refreshes `source_names` (default: all NEWS_SOURCES). Sources are scraped in parallel, and each source's items go to analysis as soon as that
+    source finishes; crime items become visible to readers as their analysis lands. A source
+    whose scrape fails or exceeds SOURCE_SCRAPE_TIMEOUT_SECONDS is skipped for this cycle without
+    holding back the others, and keeps the items it published in earlier cycles.
+    `on_source_done(source_name)` is called once per source when its work has really ended: after
+    its analysis, or, for a timed-out scrape we stopped waiting for, when its thread finishes.
+    Returns the published data: {"data": [...]}.
+    """
+    logging.info("Starting news fetch, analysis, and filter process...")
+    cycle_start = time.time()
+    # Not a `with` block: exiting it would wait for a hung scraper we've already given up on
+    source_names = list(NEWS_SOURCES) if source_names is None else list(source_names)
+    scrape_executor = ThreadPoolExecutor(max_workers=max(1, len(source_names)), thread_name_prefix="scrape")
+    analysis_executor = ThreadPoolExecutor(max_workers=max(1, len(source_names)), thread_name_prefix="analyze")
+    scrape_futures = {}
+    analysis_futures = {} # source_name -> future of its filtered items
+    handed_off = set() # Sources whose on_source_done call is taken care of
+    reported_done = set()
+    done_lock = threading.Lock()
+    total_raw = 0
+
+    def source_done(source_name):
+        with done_lock:
+            if source_name in reported_done:
+                return
+            reported_done.add(source_name)
+        if on_source_done is not None:
+            on_source_done(source_name)
+
+    def when_done(future, source_name):
+        handed_off.add(source_name)
+        future.add_done_callback(lambda _: source_done(source_name)) # Runs at once if already done
+
+    try:
+        for source_name in source_names:
+            logging.info(f"Scraping {source_name}...")
+            scrape_futures[scrape_executor.submit(NEWS_SOURCES[source_name])] = source_name
+        deadlines = {future: cycle_start + SOURCE_SCRAPE_TIMEOUT_SECONDS.get(name, DEFAULT_SOURCE_SCRAPE_TIMEOUT_SECONDS)
+                     for future, name in scrape_futures.items()}
+        pending = set(scrape_futures)
+        while pending:
+            timeout = max(0.0, min(deadlines[f] for f in pending) - time.time())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                source_name = scrape_futures[future]
+                try:
+                    raw_data = future.result().get("data", [])
+                except CrawlError as e:
+                    # Not an empty listing: keep the published items, the previous listing and the rate estimate
+                    logging.error(f"Scraping {source_name} failed: {e}; keeping its items from earlier cycles.")
+                    SCRAPE_ERRORS.labels(SOURCE_KEYS[source_name], "scrape").inc()
+                    when_done(future, source_name)
+                    continue
+                except Exception as e:
+                    logging.error(f"Error scraping {source_name}: {e}; keeping its items from earlier cycles.", exc_info=True)
+                    SCRAPE_ERRORS.labels(SOURCE_KEYS[source_name], "scrape").inc()
+                    when_done(future, source_name)
+                    continue
+                logging.info(f"Scraped {len(raw_data)} raw items from {source_name} ({time.time() - cycle_start:.2f}s into cycle).")
+                SCRAPE_SECONDS.labels(SOURCE_KEYS[source_name]).observe(time.time() - cycle_start)
+                SCRAPED_ITEMS.labels(SOURCE_KEYS[source_name]).set(len(raw_data))
+                total_raw += len(raw_data)
+                analysis_futures[source_name] = analysis_executor.submit(_analyze_and_publish, raw_data, source_name)
+                when_done(analysis_futures[source_name], source_name)
+            now = time.time()
+            for future in [f for f in pending if deadlines[f] <= now]:
+                logging.error(f"Scraping {scrape_futures[future]} timed out after "
+                              f"{SOURCE_SCRAPE_TIMEOUT_SECONDS.get(scrape_futures[future], DEFAULT_SOURCE_SCRAPE_TIMEOUT_SECONDS)}s; skipping it this cycle.")
+                SCRAPE_ERRORS.labels(SOURCE_KEYS[scrape_futures[future]], "timeout").inc()
+                future.cancel()
+                pending.discard(future)
+                # Its thread may still be running: the source stays in flight until it actually ends
+                when_done(future, scrape_futures[future])
+
+        logging.info(f"Total raw items scraped: {total_raw}")
+        crime_count = 0
+        for source_name, future in analysis_futures.items():
+            try:
+                crime_count += len(future.result())
+            except Exception as e:
+                logging.error(f"Error analyzing {source_name} news: {e}", exc_info=True)
+    finally:
+        scrape_executor.shutdown(wait=False, cancel_futures=True)
+        analysis_executor.shutdown(wait=False)
+        # Sources left unhandled by an error above end with their scrape (cancelled ones at once)
+        for future, source_name in scrape_futures.items():
+            if source_name not in handed_off:
+                when_done(future, source_name)
+        for source_name in source_names:
+            if source_name not in handed_off:
+                source_done(source_name) # Never submitted
+        analysis_cache.save()
+        try:
+            pruned = news_store.prune(ITEM_RETENTION_SECONDS)
+            if pruned:
+                logging.info(f"Pruned {pruned} items older than the retention window from the store.")
+        except sqlite3.Error as e:
+            logging.error(f"Store retention prune failed: {e}")
+
+    news_cache.finish_cycle()
+    snapshot = news_cache.snapshot()
+    logging.info(f"Cycle finished in {time.time() - cycle_start:.2f}s. Found {crime_count} crime items; serving {len(snapshot.data)} (version {snapshot.version}).")
 
     # *** Return the dictionary with the 'data' key ***
-    return {"data": filtered_news_items}
+    return {"data": list(snapshot.data)}
 
 
 # --- Background Thread for Cache Updates ---
+def refresh_sources(source_names):
+    """
+    Refreshes `source_names` (already started in refresh_scheduler). Each is reported finished when
+    its work really ends, so a timed-out scrape that is still running keeps its source in flight
+    and the scheduler skips that source's ticks instead of starting a second crawl.
+    """
+    start_time = time.time()
+    # Fetch, analyze, filter; items are published into news_cache as they land
+    news_data_dict = fetch_analyze_and_filter_news(source_names, on_source_done=refresh_scheduler.finish)
+    item_count = len(news_data_dict.get("data", []))
+    logging.info(f"Background task: {', '.join(source_names)} refreshed in {time.time() - start_time:.2f}s ({item_count} items served).")
+    return news_data_dict
+
 def update_news_cache():
-    global cached_news
+    try:
+        # Start the pooled browsers up front so the first cycle doesn't pay Chrome cold start
+        get_driver_pool().warm_up()
+    except Exception as e:
+        logging.error(f"Background task: Driver pool warm-up failed, browsers will start on demand: {e}")
+    # Each source runs on its own schedule; a slow source never delays the others' next run
+    runner = ThreadPoolExecutor(max_workers=len(NEWS_SOURCES), thread_name_prefix="refresh")
     while True:
-        logging.info("Background task: Attempting fetch_lock for cache update...")
-        acquired = fetch_lock.acquire(blocking=True)
-        if acquired:
-            logging.info("Background task: fetch_lock acquired. Updating cache...")
-            start_time = time.time()
-            try:
-                # Fetch, analyze, filter, get data in {"data": [...]} format
-                news_data_dict = fetch_analyze_and_filter_news()
-                with cache_lock:
-                    cached_news = news_data_dict # Store the whole dict {"data": ...}
-                item_count = len(news_data_dict.get("data", []))
-                duration = time.time() - start_time
-                logging.info(f"Background task: Cache updated ({item_count} items) in {duration:.2f}s.")
-            except Exception as e:
-                duration = time.time() - start_time
-                logging.error(f"Background task: Cache update failed ({duration:.2f}s): {e}", exc_info=True)
-            finally:
-                logging.info("Background task: Releasing fetch_lock.")
-                fetch_lock.release()
-        # else: # Should not happen with blocking=True
-
-        logging.info(f"Background task: Sleeping for {CACHE_UPDATE_INTERVAL_SECONDS}s.")
-        time.sleep(CACHE_UPDATE_INTERVAL_SECONDS)
+        for source_name in refresh_scheduler.due():
+            logging.info(f"Background task: {source_name} is due, refreshing...")
+            future = runner.submit(refresh_sources, [source_name])
+            future.add_done_callback(_log_refresh_failure)
+        refresh_scheduler.wait_for_next_run()
+
+def _log_refresh_failure(future):
+    error = future.exception()
+    if error is not None:
+        logging.error(f"Background task: Refresh failed: {error}", exc_info=error)
+
+# --- Shared Cache: Followers Track the Refresher's Snapshot ---
+def sync_shared_cache():
+    """Loads the shared snapshot from news_store if it is newer than ours. Returns True if it was."""
+    try:
+        version, _ = news_store.load_cache_state()
+        if version <= news_cache.snapshot().version:
+            return False
+        version, updated_at, records = news_store.load_shared_snapshot()
+        news_cache.replace(records, version, updated_at)
+        changes = news_store.load_changes(change_feed.latest_seq, version)
+        change_feed.extend(changes)
+        logging.info(f"Shared cache: now at version {version} ({len(records)} items, {len(changes)} changes).")
+        return True
+    except sqlite3.Error as e:
+        logging.error(f"Shared cache: could not read the shared snapshot: {e}")
+        return False
+
+def run_refresher_or_follow():
+    """
+    Background task of every worker. In "auto" mode the worker holding `refresher_lock` runs
+    update_news_cache; the others poll the shared snapshot and take over if the leader exits.
+    """
+    while True:
+        if REFRESH_MODE == "auto" and refresher_lock.acquire():
+            sync_shared_cache() # Continue from the last published version
+            logging.info(f"Refresher lock acquired (pid {os.getpid()}); this worker runs the background refresh.")
+            update_news_cache()
+            return
+        sync_shared_cache()
+        time.sleep(SHARED_CACHE_POLL_SECONDS)
 
 # --- Start Background Thread ---
-thread = threading.Thread(target=update_news_cache, daemon=True)
-thread.start()
+thread = threading.Thread(target=run_refresher_or_follow, daemon=True)
+if REFRESH_MODE in ("auto", "follower"):
+    thread.start()
+else:
+    logging.info(f"Background refresh disabled (REFRESH_MODE={REFRESH_MODE}).")
 
 # --- API Endpoints ---
 @app.get("/ping")
 def ping():
     return {"status": "alive"}
 
+@app.get("/schedule")
+def get_schedule():
+    """
+    The refresher's per-source schedule: next run, adaptive interval, observed publication rate and
+    skipped ticks. Read from the shared store, so every worker reports the leader's schedule.
+    """
+    try:
+        states = news_store.load_schedule()
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=503, detail=f"Schedule unavailable: {e}")
+    iso = lambda ts: datetime.fromtimestamp(ts).astimezone().isoformat() if ts else None
+    return {"sources": {
+        source: {
+            "next_run": iso(state["next_run"]),
+            "interval_seconds": round(state["interval"], 1),
+            "in_flight": state["in_flight"],
+            "new_items_per_hour": round(state["rate"] * 3600, 2) if state["rate"] is not None else None,
+            "last_new_items": state["last_new_items"],
+            "last_started": iso(state["last_started"]),
+            "last_finished": iso(state["last_finished"]),
+            "skipped_ticks": state["skipped_ticks"],
+        }
+        for source, state in states.items()
+    }}
+
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus metrics for the scrapers, the Groq pipeline, the cache and /new. Run with
+    PROMETHEUS_MULTIPROC_DIR to include the refresher's and the other workers' series.
+    """
+    _update_cache_gauges()
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/new")
-def get_news():
-    """Returns crime-related news in the specified format: {"data": [...]}."""
-    global cached_news
-    news_list = [] # Default to empty list
-
-    with cache_lock:
-        current_cache = cached_news # Expecting {"data": [...]} or None
-
-    if current_cache is None:
-        logging.warning("API Request: Cache empty. Trying non-blocking fetch_lock...")
-        acquired = fetch_lock.acquire(blocking=False)
-        if acquired:
-            logging.info("API Request: fetch_lock acquired. Performing sync fetch...")
+def get_news(
+    request: Request,
+    location: str | None = None,
+    crime_type: str | None = Query(None, alias="type"),
+    source: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    seed: str | None = None,
+):
+    """
+    Returns crime-related news in the specified format: {"data": [...]}, newest first.
+    Without query parameters the body is pre-encoded (plain, gzip and, if available, brotli) once
+    per cache version and carries ETag/Last-Modified; a matching If-None-Match gets a 304 (as does an
+    If-Modified-Since strictly after the version's second, since Last-Modified is only to the second).
+    With filters (location, type, source, date_from/date_to as inclusive YYYY-MM-DD), pagination
+    (limit, cursor) or a `seed` for a deterministic shuffle, the matching items are read through the
+    cache's indexes and returned as {"data": [...], "next_cursor": str | None}.
+    """
+    snapshot = news_cache.snapshot() # Immutable; never blocks on a running refresh
+
+    # Only the refresher may scrape; followers serve whatever the shared store has
+    if snapshot.version == 0 and news_cache.cycles_completed == 0 and (refresher_lock.held or REFRESH_MODE == "off"):
+        logging.warning("API Request: Cache empty. Starting the sources that aren't already running...")
+        # Sources already in flight (e.g. the scheduler's first run) aren't scraped twice
+        started = [source_name for source_name in NEWS_SOURCES if refresh_scheduler.try_start(source_name)]
+        if started:
+            logging.info(f"API Request: Performing sync fetch of {', '.join(started)}...")
             sync_start_time = time.time()
             try:
-                news_data_dict = fetch_analyze_and_filter_news()
-                with cache_lock:
-                    cached_news = news_data_dict
-                    current_cache = news_data_dict # Use newly fetched data
+                refresh_sources(started)
+                snapshot = news_cache.snapshot() # Use newly fetched data
                 duration = time.time() - sync_start_time
                 logging.info(f"API Request: Sync fetch success ({duration:.2f}s).")
             except Exception as e:
                 duration = time.time() - sync_start_time
                 logging.error(f"API Request: Sync fetch error ({duration:.2f}s): {e}", exc_info=True)
-                fetch_lock.release() # Release lock on error
-                logging.info("API Request: fetch_lock released (sync error).")
-                # Return error structure (or could return empty data as below)
                 # Consider what the client expects on failure
                 return {"error": "Could not fetch news", "details": str(e)} # Or just {"data": []}
-            finally:
-                # Release lock if acquired and still held (success case)
-                if acquired and fetch_lock.locked():
-                    logging.info("API Request: Releasing fetch_lock (sync success).")
-                    fetch_lock.release()
         else:
-            logging.warning("API Request: Fetch lock busy. Returning empty data.")
+            logging.warning("API Request: Every source is already being refreshed and nothing published yet. Returning empty data.")
             # Return the desired structure but empty, maybe with a message
             return {"data": [], "message": "News update in progress"}
 
-    # Extract the list from the cache (either existing or from sync fetch)
-    if current_cache:
-        news_list = current_cache.get("data", [])
+    # Items published so far (possibly mid-cycle) form one consistent snapshot
+    if any(value is not None for value in (location, crime_type, source, date_from, date_to, limit, cursor, seed)):
+        # Dates are compared in the same (server-local) time as the parsed item dates
+        since = datetime(date_from.year, date_from.month, date_from.day).timestamp() if date_from else None
+        until = (datetime(date_to.year, date_to.month, date_to.day) + timedelta(days=1)).timestamp() if date_to else None
+        try:
+            items, next_cursor = query_snapshot(snapshot, location=location, crime_type=crime_type, source=source,
+                                                since=since, until=until, limit=limit, cursor=cursor, seed=seed)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"data": items, "next_cursor": next_cursor}
+
+    encoded = response_cache.get(snapshot)
+    headers = {
+        "Last-Modified": encoded.last_modified,
+        "Cache-Control": "no-cache", # Clients may store it but must revalidate
+        "Vary": "Accept-Encoding",
+    }
+    encoding = encoded.negotiate(request.headers.get("accept-encoding"))
+    headers["ETag"] = encoded.etag_for(encoding)
+    if encoded.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=encoded.encoded[encoding], media_type="application/json", headers=headers)
+
+
+async def _resume_seq(cursor: str) -> int:
+    """
+    Sequence number of a change feed `cursor`, -1 if malformed. A cursor issued by a worker that
+    has read further in the change log than we have makes us catch up with the store first.
+    """
+    seq = change_feed.parse_cursor(cursor)
+    if seq > change_feed.latest_seq:
+        await asyncio.to_thread(sync_shared_cache)
+    return seq
+
+@app.get("/new/changes")
+async def get_news_changes(
+    since: str | None = None,
+    timeout: float = Query(LONG_POLL_TIMEOUT_SECONDS, ge=0, le=LONG_POLL_TIMEOUT_SECONDS),
+):
+    """
+    Long-poll change feed: {"events": [...], "cursor": str, "reset": bool}.
+    Without `since`, returns the current cursor at once. Otherwise waits up to `timeout` seconds
+    for changes after `since`. Cursors come from the shared change log, so any worker resumes them.
+    On "reset" (cursor too old or unknown) reload /new and continue from the returned cursor.
+    """
+    if since is None:
+        return {"events": [], "cursor": change_feed.cursor(), "reset": False}
+    events, reset = await change_feed.wait(await _resume_seq(since), timeout)
+    if reset:
+        return {"events": [], "cursor": change_feed.cursor(), "reset": True}
+    cursor = change_feed.cursor(events[-1].seq) if events else since
+    return {"events": [event.to_dict() for event in events], "cursor": cursor, "reset": False}
+
+@app.get("/new/stream")
+async def stream_news_changes(request: Request, since: str | None = None):
+    """
+    Server-Sent Events stream of cache changes ("upsert"/"remove" events, event id = cursor).
+    Resumes after `since` or the Last-Event-ID header; a "reset" event means reload /new.
+    """
+    resume_from = request.headers.get("last-event-id") or since
+
+    async def event_stream():
+        seq = await _resume_seq(resume_from) if resume_from else change_feed.latest_seq
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            events, reset = await change_feed.wait(seq, SSE_HEARTBEAT_SECONDS)
+            if reset:
+                seq = change_feed.latest_seq
+                yield f"id: {change_feed.cursor(seq)}\nevent: reset\ndata: {{}}\n\n"
+            elif not events:
+                yield ": keep-alive\n\n"
+            else:
+                for event in events:
+                    yield f"id: {change_feed.cursor(event.seq)}\nevent: {event.kind}\ndata: {json.dumps(event.to_dict(), ensure_ascii=False)}\n\n"
+                seq = events[-1].seq
 
-    # *** Return the final structure ***
-    return {"data": news_list}
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # --- Main Execution ---
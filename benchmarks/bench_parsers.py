@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of the listing parser backends on saved pages.
+
+Usage:
+    python benchmarks/bench_parsers.py ndtv saved_ndtv.html [--repeat 20]
+    python benchmarks/bench_parsers.py ani saved_ani_page1.html saved_ani_page2.html
+
+Save pages with `curl` (ANI) or by writing `driver.page_source` after scrolling (NDTV).
+Every backend must extract the same items as the original full-page BeautifulSoup path
+("bs4-full"); the script exits non-zero if one doesn't.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import available_backends, parse_listing  # noqa: E402
+
+
+def bench_backend(source, pages, backend, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parse_listing(source, html, backend)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", choices=["ndtv", "ani"])
+    parser.add_argument("pages", nargs="+", help="Saved HTML listing pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+
+    reference = [parse_listing(args.source, html, "bs4-full") for html in pages]
+    results = {}
+    ok = True
+    for backend in available_backends():
+        extracted = [parse_listing(args.source, html, backend) for html in pages]
+        matches = extracted == reference
+        ok = ok and matches
+        timings = bench_backend(args.source, pages, backend, args.repeat)
+        results[backend] = {
+            "items": sum(len(items) for items in extracted),
+            "matches_reference": matches,
+            "mean_ms": statistics.mean(timings) * 1000,
+            "min_ms": min(timings) * 1000,
+        }
+    baseline = results["bs4-full"]["mean_ms"]
+    for result in results.values():
+        result["speedup_vs_bs4_full"] = baseline / result["mean_ms"] if result["mean_ms"] else None
+
+    print(json.dumps({
+        "source": args.source,
+        "pages": len(pages),
+        "bytes": sum(len(html) for html in pages),
+        "repeat": args.repeat,
+        "backends": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
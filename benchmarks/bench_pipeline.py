@@ -0,0 +1,254 @@
+"""
+Offline benchmark of the scrape -> analyze -> publish pipeline on recorded pages.
+
+Runs three scenarios without network access, Chrome or a Groq key:
+  parser    parse the fixture listings with every parser backend
+  analysis  app.analyze_and_filter_items on the fixture headlines, cold analysis cache
+  e2e       app.fetch_analyze_and_filter_news, cold (empty store) and warm (unchanged listings,
+            so pages are reused by fingerprint or HTTP 304 instead of parsed)
+
+Pages come from benchmarks/fixtures/ (synthetic snapshots with the live sites' listing markup);
+ANI is served through an httpx mock transport (with ETags unless --no-etag) and NDTV's browser
+load is replaced by the fixture, each after --page-latency-ms. Groq is benchmarks/fake_groq.py, started in-process.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scenario all] [--repeat 5] [--groq-latency-ms 300]
+    python benchmarks/bench_pipeline.py --scenario analysis --rate-limit-every 5 > results.json
+
+Prints one JSON document with p50/p99/mean latencies and throughput per scenario.
+"""
+import argparse
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+sys.path.insert(0, ROOT)
+
+from fake_groq import FakeGroqServer  # noqa: E402
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of `samples`."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(timings, units, unit_name):
+    """Latency summary of `timings` (seconds per run) with `units` processed per run."""
+    total = sum(timings)
+    return {
+        "runs": len(timings),
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+        f"{unit_name}_per_run": units,
+        f"{unit_name}_per_second": units * len(timings) / total if total else None,
+    }
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURES, "ndtv_delhi_news.html"), "r", encoding="utf-8") as f:
+        ndtv_page = f.read()
+    ani_pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "ani_delhi_page*.html"))):
+        page_num = int(os.path.basename(path)[len("ani_delhi_page"):-len(".html")])
+        with open(path, "r", encoding="utf-8") as f:
+            ani_pages[page_num] = f.read()
+    return ndtv_page, ani_pages
+
+
+def bench_parser(ndtv_page, ani_pages, repeat):
+    from parsers import available_backends, parse_listing
+    pages = [("ndtv", ndtv_page)] + [("ani", html) for html in ani_pages.values()]
+    results = {}
+    for backend in available_backends():
+        timings = []
+        items = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            items = sum(len(parse_listing(source, html, backend)) for source, html in pages)
+            timings.append(time.perf_counter() - start)
+        results[backend] = summarize(timings, items, "items")
+        results[backend]["pages"] = len(pages)
+    return results
+
+
+def install_fixture_sources(ndtv_page, ani_pages, page_latency, etags=True):
+    """Routes both sources to the fixtures: ANI through a mock HTTP transport, NDTV past the browser."""
+    import httpx
+
+    import crawler
+    import fetcher
+
+    def ani_handler(request):
+        time.sleep(page_latency)
+        parts = [part for part in request.url.path.split("/") if part]
+        html = ani_pages.get(int(parts[-1])) if parts and parts[-1].isdigit() else None
+        if html is None:
+            return httpx.Response(404, text="Not found")
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if etags:
+            headers["ETag"] = f'"{hashlib.md5(html.encode("utf-8")).hexdigest()}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return httpx.Response(304, headers={"ETag": headers["ETag"]})
+        return httpx.Response(200, text=html, headers=headers)
+
+    def load_ndtv_page(driver, spec, url, watermark=None):
+        time.sleep(page_latency)
+        return ndtv_page
+
+    class FixtureDriverPool:
+        @contextlib.contextmanager
+        def session(self, source=None):
+            yield None
+
+    fetcher._http_client = httpx.Client(transport=httpx.MockTransport(ani_handler), follow_redirects=True)
+    crawler._load_scrolled_page = load_ndtv_page
+    crawler.get_driver_pool = lambda: FixtureDriverPool()
+
+
+def reset_state(app, workdir, run):
+    """Points the app at an empty store, analysis cache, story index, news cache, watermarks and page cache (a cold start)."""
+    import page_cache
+    import watermarks
+    from analysis_cache import AnalysisCache
+    from near_duplicates import StoryIndex
+    from news_cache import NewsCache
+    from store import NewsStore
+
+    store = NewsStore(os.path.join(workdir, f"cold-{run}.db"))
+    app.news_store = store
+    app.analysis_cache = AnalysisCache(
+        path=os.path.join(workdir, "unused.json"),
+        namespace=app.analysis_cache.namespace,
+        ttl_seconds=app.ANALYSIS_CACHE_TTL_SECONDS,
+        max_entries=app.ANALYSIS_CACHE_MAX_ENTRIES,
+        store=store,
+    )
+    app.news_cache = NewsCache()
+    app.story_index = StoryIndex()
+    app.previous_listings.clear()
+    watermarks._watermark_store = watermarks.WatermarkStore(store, legacy_path=os.path.join(workdir, "unused.json"))
+    page_cache._page_cache = page_cache.PageCache(store)
+
+
+def scrape_fixture_listings():
+    from crawler import crawl_source
+    from sources import SOURCES
+    return {spec.name: crawl_source(spec)["data"] for spec in SOURCES}
+
+
+def bench_analysis(app, groq, workdir, repeat):
+    listings = scrape_fixture_listings()
+    headlines = sum(len(raw) for raw in listings.values())
+    timings = []
+    groq.reset_stats()
+    for run in range(repeat):
+        reset_state(app, workdir, f"analysis-{run}")
+        start = time.perf_counter()
+        crime = sum(len(app.analyze_and_filter_items(raw, source)) for source, raw in listings.items())
+        timings.append(time.perf_counter() - start)
+    result = summarize(timings, headlines, "headlines")
+    result["crime_items"] = crime
+    result["groq"] = groq.stats()
+    return result
+
+
+def page_cache_stats():
+    """Listing pages parsed vs reused since the last reset_state(), per source."""
+    from page_cache import get_page_cache
+    return get_page_cache().stats()
+
+
+def bench_e2e(app, groq, workdir, repeat):
+    from page_cache import get_page_cache
+    results = {}
+    for mode in ("cold", "warm"):
+        timings = []
+        groq.reset_stats()
+        items = 0
+        for run in range(repeat):
+            if mode == "cold" or run == 0:
+                reset_state(app, workdir, f"e2e-{mode}-{run}")
+            if mode == "warm" and run == 0:
+                app.fetch_analyze_and_filter_news() # Prime: the timed runs see unchanged listings
+                groq.reset_stats()
+                get_page_cache().reset_stats()
+            start = time.perf_counter()
+            items = len(app.fetch_analyze_and_filter_news()["data"])
+            timings.append(time.perf_counter() - start)
+        results[mode] = summarize(timings, items, "published_items")
+        results[mode]["groq"] = groq.stats()
+        results[mode]["listing_pages"] = page_cache_stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["all", "parser", "analysis", "e2e"], default="all")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-latency-ms", type=float, default=50.0, help="Simulated page load time")
+    parser.add_argument("--groq-latency-ms", type=float, default=300.0)
+    parser.add_argument("--groq-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--groq-per-headline-ms", type=float, default=5.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Fake Groq answers every Nth request with a 429")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    parser.add_argument("--rpm", type=int, default=6000, help="Client-side Groq request budget per minute")
+    parser.add_argument("--tpm", type=int, default=10_000_000, help="Client-side Groq token budget per minute")
+    parser.add_argument("--no-etag", action="store_true", help="Serve ANI without ETags (pages reused by fingerprint only)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's INFO logging")
+    args = parser.parse_args()
+
+    ndtv_page, ani_pages = load_fixtures()
+    results = {"repeat": args.repeat, "scenarios": {}}
+    if args.scenario in ("all", "parser"):
+        results["scenarios"]["parser"] = bench_parser(ndtv_page, ani_pages, args.repeat)
+
+    if args.scenario in ("all", "analysis", "e2e"):
+        groq = FakeGroqServer(latency_ms=args.groq_latency_ms, jitter_ms=args.groq_jitter_ms,
+                              per_headline_ms=args.groq_per_headline_ms, rate_limit_every=args.rate_limit_every,
+                              rate_limit_probability=args.rate_limit_probability,
+                              retry_after_ms=args.retry_after_ms).start()
+        with tempfile.TemporaryDirectory(prefix="sentinal-bench-") as workdir:
+            # Configure the app before importing it: fake Groq, throwaway store, no refresh thread
+            os.environ["api_key"] = "fake-key"
+            os.environ["GROQ_BASE_URL"] = groq.base_url
+            os.environ["REFRESH_MODE"] = "off"
+            os.environ["STORE_PATH"] = os.path.join(workdir, "boot.db")
+            os.environ["ANALYSIS_CACHE_PATH"] = os.path.join(workdir, "analysis_cache.json")
+            os.environ["WATERMARKS_PATH"] = os.path.join(workdir, "watermarks.json")
+            import app
+            from rate_limiter import RateLimiter
+            if not args.verbose:
+                logging.getLogger().setLevel(logging.WARNING)
+            app.groq_rate_limiter = RateLimiter(args.rpm, args.tpm)
+            install_fixture_sources(ndtv_page, ani_pages, args.page_latency_ms / 1000, etags=not args.no_etag)
+
+            results["groq"] = {"latency_ms": args.groq_latency_ms, "jitter_ms": args.groq_jitter_ms,
+                               "per_headline_ms": args.groq_per_headline_ms,
+                               "rate_limit_every": args.rate_limit_every,
+                               "rate_limit_probability": args.rate_limit_probability,
+                               "batch_size": app.GROQ_BATCH_SIZE, "concurrency": app.GROQ_MAX_CONCURRENCY}
+            if args.scenario in ("all", "analysis"):
+                results["scenarios"]["analysis"] = bench_analysis(app, groq, workdir, args.repeat)
+            if args.scenario in ("all", "e2e"):
+                results["scenarios"]["e2e"] = bench_e2e(app, groq, workdir, args.repeat)
+        groq.stop()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat completions API, for offline benchmarks.
+
+Classifies the headlines in app.py's single and batch prompts by keyword, with configurable
+latency and 429 behaviour, so the analysis loop can be measured without network or quota.
+
+Usage:
+    python benchmarks/fake_groq.py [--port 8765] [--latency-ms 300] [--rate-limit-every 10]
+    GROQ_BASE_URL=http://127.0.0.1:8765 api_key=fake uvicorn app:app
+
+Benchmarks start it in-process with FakeGroqServer(...).start().
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Keyword classifier (first match wins) ---
+CRIME_KEYWORDS = [
+    ("murder", "Murder"), ("body found", "Murder"), ("stabbed", "Assault"), ("shooter", "Shooting"),
+    ("encounter", "Shooting"), ("snatch", "Snatching"), ("stealing", "Theft"), ("thieves", "Theft"),
+    ("looted", "Robbery"), ("drug", "Drug Trafficking"), ("heroin", "Drug Trafficking"),
+    ("fraud", "Fraud"), ("cheated", "Fraud"), ("duping", "Fraud"), ("hit-and-run", "Hit and Run"),
+    ("bail", "Court Proceedings"), ("arrested", "Arrest"), ("held", "Arrest"), ("detained", "Arrest"),
+]
+
+_BATCH_LINE_RE = re.compile(r"^\s*(\d+)\. '(.*)'\s*$", re.MULTILINE)
+_SINGLE_RE = re.compile(r"^\s*Headline: '(.*)'\s*$", re.MULTILINE)
+
+
+def classify(headline):
+    lowered = headline.lower()
+    for keyword, crime_type in CRIME_KEYWORDS:
+        if keyword in lowered:
+            return {"is_crime": True, "crime_type": crime_type}
+    return {"is_crime": False, "crime_type": "N/A"}
+
+
+def answer(prompt):
+    """Returns (JSON content, number of headlines) for one of app.py's analysis prompts."""
+    numbered = _BATCH_LINE_RE.findall(prompt)
+    if numbered:
+        results = [dict(index=int(index), **classify(headline)) for index, headline in numbered]
+        return json.dumps({"results": results}), len(results)
+    single = _SINGLE_RE.search(prompt)
+    return json.dumps(classify(single.group(1) if single else "")), 1
+
+
+class FakeGroqServer:
+    """
+    Threaded HTTP server answering POST .../chat/completions.
+    Each request sleeps `latency_ms` (+ up to `jitter_ms`, + `per_headline_ms` per classified headline).
+    Every `rate_limit_every`-th request, or a `rate_limit_probability` fraction of them, gets a 429
+    with a retry-after-ms header of `retry_after_ms`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, per_headline_ms=0.0,
+                 rate_limit_every=0, rate_limit_probability=0.0, retry_after_ms=200, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_headline_ms = per_headline_ms
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after_ms = retry_after_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.headlines = 0
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "rate_limited": self.rate_limited, "headlines": self.headlines}
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = self.rate_limited = self.headlines = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _admit(self):
+        """Counts one request; returns (admitted, jitter ms). Not admitted means answer with a 429."""
+        with self._lock:
+            self.requests += 1
+            limited = (self.rate_limit_every and self.requests % self.rate_limit_every == 0) or \
+                      (self.rate_limit_probability and self._random.random() < self.rate_limit_probability)
+            if limited:
+                self.rate_limited += 1
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        return not limited, jitter
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                admitted, jitter = server._admit()
+                if not admitted:
+                    self._reply(429, {"error": {"message": "Rate limit reached (fake).", "type": "tokens",
+                                                "code": "rate_limit_exceeded"}},
+                                {"retry-after-ms": str(server.retry_after_ms)})
+                    return
+
+                prompt = "".join(message.get("content", "") for message in request.get("messages", []))
+                content, headline_count = answer(prompt)
+                with server._lock:
+                    server.headlines += headline_count
+                time.sleep((server.latency_ms + jitter + server.per_headline_ms * headline_count) / 1000)
+                prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+                self._reply(200, {
+                    "id": f"chatcmpl-fake-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--per-headline-ms", type=float, default=5.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a 429")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.per_headline_ms,
+                            args.rate_limit_every, args.rate_limit_probability, args.retry_after_ms).start()
+    print(f"Fake Groq listening on {server.base_url} (set GROQ_BASE_URL to this)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(json.dumps(server.stats()))
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from typing import NamedTuple
+
+# --- Configuration ---
+CHANGE_FEED_CAPACITY = 2000 # Recent change events kept for catch-up
+LONG_POLL_TIMEOUT_SECONDS = 30
+SSE_HEARTBEAT_SECONDS = 15
+
+
+class ChangeEvent(NamedTuple):
+    seq: int # Strictly increasing position in the store's change log; doubles as the client's cursor
+    kind: str # "upsert" (new or updated item) or "remove"
+    source: str
+    item: dict # The formatted item; only {"id", "url"} for removals
+    version: int # news_cache version after this change
+    at: float
+
+    def to_dict(self):
+        return {"seq": self.seq, "kind": self.kind, "source": self.source, "item": self.item,
+                "version": self.version, "at": self.at}
+
+
+class ChangeFeed:
+    """
+    Bounded ring buffer of cache change events with async waiters.
+    Events are the shared store's change log, numbered by the store, so every worker holds the
+    same events under the same sequence numbers and a cursor from one resumes on any other.
+    Writers extend from any thread; readers catch up with since(seq) in O(new events) and
+    idle readers wait on one shared future per event loop, so a wake-up costs O(loops),
+    not O(subscribers).
+    """
+
+    def __init__(self, capacity=CHANGE_FEED_CAPACITY):
+        self.capacity = capacity
+        self._buffer = [None] * capacity
+        self._latest_seq = 0
+        self._first_seq = 1 # Events from here on are contiguous; older cursors reset
+        self._lock = threading.Lock()
+        self._signals = {} # event loop -> future resolved on the next append
+
+    @property
+    def latest_seq(self):
+        return self._latest_seq
+
+    def cursor(self, seq=None):
+        """Opaque cursor for `seq` (default: the latest event)."""
+        return str(self._latest_seq if seq is None else seq)
+
+    def parse_cursor(self, cursor):
+        """Returns the sequence number of `cursor`, or -1 if it is malformed (forces a reset)."""
+        return int(cursor) if (cursor or "").isdigit() else -1
+
+    def extend(self, events):
+        """
+        Appends logged changes, (seq, kind, source, item, version, at) in seq order. Events already
+        held are skipped; after a gap (changes evicted from the log before we read them) cursors
+        from before it reset.
+        """
+        with self._lock:
+            latest = self._latest_seq
+            for event in events:
+                event = ChangeEvent(*event)
+                if event.seq <= self._latest_seq:
+                    continue
+                if event.seq != self._latest_seq + 1:
+                    self._first_seq = event.seq
+                self._buffer[event.seq % self.capacity] = event
+                self._latest_seq = event.seq
+            if self._latest_seq == latest:
+                return
+            signals, self._signals = self._signals, {}
+        for loop, future in signals.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def since(self, seq):
+        """
+        Returns (events after `seq`, reset). `reset` is True if some of those events were already
+        evicted from the buffer; the client should then reload /new and continue from latest_seq.
+        """
+        with self._lock:
+            latest = self._latest_seq
+            if seq > latest:
+                return [], True # Not in the change log we've read
+            if seq == latest:
+                return [], False
+            oldest = max(self._first_seq, latest - self.capacity + 1)
+            reset = seq < oldest - 1
+            start = max(seq + 1, oldest)
+            return [self._buffer[s % self.capacity] for s in range(start, latest + 1)], reset
+
+    async def wait(self, seq, timeout):
+        """Waits up to `timeout` seconds for events after `seq`; returns since(seq)."""
+        events, reset = self.since(seq)
+        if events or reset:
+            return events, reset
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._latest_seq > seq:
+                future = None # Appended while we checked
+            else:
+                future = self._signals.get(loop)
+                if future is None:
+                    future = self._signals[loop] = loop.create_future()
+        if future is not None:
+            try:
+                # Shielded: the shared future must survive one waiter timing out
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.since(seq)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
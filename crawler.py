@@ -0,0 +1,307 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import WebDriverException
+
+from driver import element_attributes, get_driver_pool, scroll_until_stable, wait_for_selector
+from fetcher import domain_slot, element_pattern, fetch_html
+from items import item_id
+from metrics import PAGE_LOAD_SECONDS, PARSE_SECONDS, SCRAPE_ERRORS, SCROLL_SECONDS
+from page_cache import CachedPage, get_page_cache, listing_fingerprint, parse_key
+from parsers import PARSER_BACKEND, parse_listing, parse_with_selectors
+from sources import format_item_datetime
+from watermarks import get_watermark_store
+
+# One engine for every registered source (sources.SOURCES). Browsers come from the shared driver
+# pool, HTTP from the shared keep-alive client, and every fetch goes through fetcher.domain_slot,
+# so sources crawled concurrently by the refresher stay within each domain's politeness limits.
+
+
+class CrawlError(Exception):
+    """A crawl produced no usable listing (as opposed to a listing that is genuinely empty)."""
+
+
+def listing_pattern(spec):
+    """Regex telling whether served HTML already contains the listing (the last compound of item_selector)."""
+    compound = spec.item_selector.split()[-1]
+    tag, _, classes = compound.partition(".")
+    if classes:
+        return element_pattern(tag or r"\w+", classes.split(".")[0])
+    return re.compile(rf"<{re.escape(tag)}\b", re.IGNORECASE)
+
+
+def parse_items(spec, html):
+    """Raw field dicts of a listing page, via the source's tuned parser or its declared selectors."""
+    backend = PARSER_BACKEND if spec.parser else "selectors"
+    with PARSE_SECONDS.labels(spec.key, backend).time():
+        if spec.parser:
+            return parse_listing(spec.parser, html)
+        return parse_with_selectors(html, spec.item_selector, spec.fields)
+
+
+def _parse_salt(spec):
+    return f"{spec.parser}|{spec.item_selector}|{json.dumps(spec.fields, sort_keys=True)}"
+
+
+def _current_cached_page(spec, url):
+    """The page cache's entry for `url` if it was parsed the way `spec` parses now, else None."""
+    cached = get_page_cache().get(url)
+    return cached if cached is not None and cached.parse_key == parse_key(_parse_salt(spec)) else None
+
+
+def parse_page(spec, url, html, etag=None, last_modified=None):
+    """
+    Parsed items of a fetched listing page, and "parsed" or "unchanged": when the page's listing
+    region hashes the same as on the last crawl, the stored items are reused without parsing.
+    """
+    salt = _parse_salt(spec)
+    fingerprint = listing_fingerprint(html, listing_pattern(spec), salt)
+    cached = _current_cached_page(spec, url)
+    if fingerprint is not None and cached is not None and cached.fingerprint == fingerprint:
+        get_page_cache().put(url, spec.key, cached._replace(etag=etag, last_modified=last_modified))
+        return list(cached.items), "unchanged"
+    items = parse_items(spec, html)
+    get_page_cache().put(url, spec.key, CachedPage(fingerprint, etag, last_modified, items, parse_key(salt)))
+    return items, "parsed"
+
+
+def _count_page(spec, pages, outcome):
+    pages[outcome] += 1
+    get_page_cache().record(spec.key, outcome)
+
+
+def build_entries(spec, items, page_url, seen_links=None):
+    """
+    Turns parsed items into raw entries ({"content", "date", "id", "imageUrl", "readMoreUrl",
+    "time", "url"}), skipping items without headline or link and links in `seen_links` (updated).
+    """
+    seen_links = set() if seen_links is None else seen_links
+    entries = []
+    for index, item in enumerate(items):
+        try:
+            headline = item.get("headline", "N/A")
+            link = item.get("link", "N/A")
+            if not headline or headline == "N/A" or not headline.strip():
+                logging.warning(f"{spec.name}: Skipping item {index + 1} due to missing headline.")
+                continue
+            if not link or link == "N/A":
+                logging.warning(f"{spec.name}: Skipping item {index + 1} due to missing link.")
+                continue
+            link = urljoin(page_url, link)
+            if link in seen_links:
+                logging.debug(f"{spec.name}: Skipping duplicate link: {link}")
+                continue
+            seen_links.add(link)
+            date, time_of_day = format_item_datetime(spec, item.get("date_time"))
+            entries.append({
+                "content": headline,
+                "date": date,
+                "id": item_id(link), # Stable across cycles
+                "imageUrl": item.get("image_url", "N/A"),
+                "readMoreUrl": link,
+                "time": time_of_day,
+                "url": link,
+            })
+        except Exception as e:
+            logging.error(f"{spec.name}: Error processing item {index + 1} (Link: {item.get('link', 'N/A')}): {e}", exc_info=True)
+            SCRAPE_ERRORS.labels(spec.key, "item").inc()
+    return entries
+
+
+# --- Strategy: one infinite-scroll page in a browser ---
+def _load_scrolled_page(driver, spec, url, watermark=None):
+    """
+    Loads and scrolls `url` on a pooled driver. Returns the page source, or "" on failure.
+    With a `watermark` (incremental crawl), scrolling stops at the first batch of already-seen items.
+    """
+    load_start = time.perf_counter()
+    try:
+        logging.info(f"{spec.name}: Loading webpage: {url}")
+        driver.get(url)
+    except WebDriverException as e:
+        logging.error(f"{spec.name}: Error loading webpage: {e}")
+        SCRAPE_ERRORS.labels(spec.key, "load").inc()
+        return ""
+
+    # Wait for the listing instead of a fixed sleep
+    found, waited = wait_for_selector(driver, spec.item_selector, spec.load_timeout_seconds)
+    PAGE_LOAD_SECONDS.labels(spec.key, "browser").observe(time.perf_counter() - load_start)
+    if found:
+        logging.info(f"{spec.name}: Items present after {waited:.2f}s.")
+    else:
+        logging.warning(f"{spec.name}: No items after {waited:.2f}s (budget {spec.load_timeout_seconds}s). Proceeding with current content.")
+
+    # Stop once the item count stops growing (or we reach already-seen items)
+    stop_when = None
+    if watermark is not None:
+        link_attribute = spec.fields.get("link", "@href").partition("@")[2] or "href"
+
+        def stop_when(driver, start, end):
+            batch_links = [urljoin(url, link) for link in element_attributes(driver, spec.item_selector, link_attribute, start, end) if link]
+            if watermark.all_seen(batch_links):
+                logging.info(f"{spec.name}: Items {start + 1}-{end} were all seen in earlier cycles; stopping scroll.")
+                return True
+            return False
+    try:
+        scrolls, item_count, waited = scroll_until_stable(
+            driver, spec.item_selector,
+            max_scrolls=spec.max_scrolls,
+            settle_timeout=spec.scroll_settle_seconds,
+            max_seconds=spec.scroll_budget_seconds,
+            stop_when=stop_when,
+        )
+        logging.info(f"{spec.name}: Scrolling finished: {scrolls} scrolls, {item_count} items, waited {waited:.2f}s.")
+        SCROLL_SECONDS.labels(spec.key).observe(waited)
+    except Exception as e:
+        logging.error(f"{spec.name}: Error during scrolling: {e}. Proceeding with current content.")
+        SCRAPE_ERRORS.labels(spec.key, "scroll").inc()
+
+    try:
+        page_source = driver.page_source
+    except Exception as e:
+        logging.error(f"{spec.name}: Error extracting page source: {e}")
+        SCRAPE_ERRORS.labels(spec.key, "page_source").inc()
+        return ""
+    if not page_source:
+        logging.warning(f"{spec.name}: Page source is empty!")
+    return page_source
+
+
+def _crawl_scrolled(spec, watermark, full_crawl, pages):
+    """Returns (entries, complete); raises CrawlError if the page couldn't be loaded or parsed."""
+    url = spec.url_template
+    try:
+        # The browser goes back to the pool before parsing, so other sources can use it meanwhile
+        with domain_slot(url), get_driver_pool().session(source=spec.key) as driver:
+            page_source = _load_scrolled_page(driver, spec, url, watermark=None if full_crawl else watermark)
+    except Exception as e:
+        SCRAPE_ERRORS.labels(spec.key, "driver").inc()
+        raise CrawlError(f"WebDriver error: {e}") from e
+    if not page_source:
+        raise CrawlError("no page source")
+    try:
+        items, outcome = parse_page(spec, url, page_source)
+    except Exception as e:
+        SCRAPE_ERRORS.labels(spec.key, "parse").inc()
+        raise CrawlError(f"error parsing items: {e}") from e
+    _count_page(spec, pages, outcome)
+    logging.info(f"{spec.name}: Found {len(items)} items{' (listing unchanged, not re-parsed)' if outcome == 'unchanged' else ''}.")
+    return build_entries(spec, items, url), True
+
+
+# --- Strategy: numbered pages over HTTP, browser fallback ---
+def _browser_page_loader(spec):
+    def load(driver, url):
+        """Browser fallback: loads a listing page on a pooled driver and returns its source."""
+        driver.get(url)
+        found, waited = wait_for_selector(driver, spec.item_selector, spec.load_timeout_seconds)
+        logging.debug(f"{spec.name}: Items {'present' if found else 'NOT found'} after {waited:.2f}s (budget {spec.load_timeout_seconds}s).")
+        try:
+            # One scroll; returns once lazy items stop appearing
+            _, item_count, waited = scroll_until_stable(
+                driver, spec.item_selector, max_scrolls=1,
+                settle_timeout=spec.scroll_settle_seconds, max_seconds=spec.scroll_settle_seconds,
+            )
+            SCROLL_SECONDS.labels(spec.key).observe(waited)
+        except Exception as scroll_e:
+            logging.warning(f"{spec.name}: Scrolling failed on {url}: {scroll_e}")
+        return driver.page_source
+    return load
+
+
+def _crawl_page(spec, page_num):
+    """
+    Fetches and parses one listing page, conditionally (with the last crawl's validators) only if
+    the cached items were parsed the way the source parses now.
+    Returns (page url, parsed items, outcome); no items and outcome None on failure.
+    """
+    url = spec.url_template.format(page=page_num)
+    try:
+        cached = _current_cached_page(spec, url)
+        result = fetch_html(url, listing_pattern(spec), browser_loader=_browser_page_loader(spec), source=spec.key,
+                            etag=cached.etag if cached else None, last_modified=cached.last_modified if cached else None)
+        if result.via == "not-modified":
+            logging.info(f"{spec.name}: Page {page_num} not modified since the last crawl.")
+            return url, list(cached.items), "not_modified"
+        if not result.html:
+            logging.error(f"{spec.name}: Failed to get page {page_num}. Skipping page.")
+            SCRAPE_ERRORS.labels(spec.key, "load").inc()
+            return url, [], None
+        logging.info(f"{spec.name}: Page {page_num} fetched via {result.via}.")
+        items, outcome = parse_page(spec, url, result.html, result.etag, result.last_modified)
+        if not items:
+            logging.warning(f"{spec.name}: No items found on page {page_num} with selector '{spec.item_selector}'!")
+        return url, items, outcome
+    except WebDriverException as e:
+        logging.error(f"{spec.name}: WebDriver error scraping page {page_num}: {e}")
+        SCRAPE_ERRORS.labels(spec.key, "driver").inc()
+        return url, [], None
+    except Exception as e:
+        logging.error(f"{spec.name}: Unexpected error scraping page {page_num}: {e}", exc_info=True)
+        SCRAPE_ERRORS.labels(spec.key, "page").inc()
+        return url, [], None
+
+
+def _crawl_paginated(spec, watermark, full_crawl, pages):
+    """
+    On a full crawl all pages are fetched at once. On an incremental crawl pages are fetched in
+    waves of page_concurrency and pagination stops at the first page whose items were all seen.
+    Returns (entries, complete), complete being False if some page failed; raises CrawlError if all did.
+    """
+    entries = []
+    fetched, failed = 0, 0
+    seen_links = set() # Unique links across all pages
+    wave_size = spec.pages if full_crawl else spec.page_concurrency
+    with ThreadPoolExecutor(max_workers=spec.page_concurrency, thread_name_prefix=f"{spec.key}-page") as executor:
+        for wave_start in range(1, spec.pages + 1, wave_size):
+            # map() yields pages in order, so the dedup is the same as a sequential crawl
+            page_nums = range(wave_start, min(wave_start + wave_size, spec.pages + 1))
+            for page_num, (url, items, outcome) in zip(page_nums, executor.map(lambda n: _crawl_page(spec, n), page_nums)):
+                if outcome is None:
+                    failed += 1
+                    continue
+                fetched += 1
+                _count_page(spec, pages, outcome)
+                page_entries = build_entries(spec, items, url, seen_links)
+                entries += page_entries
+                logging.info(f"{spec.name}: Page {page_num} added {len(page_entries)} new unique items ({len(entries)} so far).")
+                page_links = [urljoin(url, item.get("link")) for item in items if item.get("link") not in (None, "N/A")]
+                if not full_crawl and watermark.all_seen(page_links):
+                    logging.info(f"{spec.name}: Page {page_num} only has items seen in earlier cycles; stopping pagination.")
+                    return entries, not failed
+    if not fetched:
+        raise CrawlError(f"all {failed} pages failed")
+    return entries, not failed
+
+
+_STRATEGIES = {"scroll": _crawl_scrolled, "paginate": _crawl_paginated}
+
+
+def crawl_source(spec):
+    """
+    Crawls one registered source and returns {"data": [raw entries]}: a full crawl, or an
+    incremental one (stopping at already-seen items) merged into the stored listing.
+    Raises CrawlError (or whatever else went wrong) instead of returning a listing when the crawl
+    failed, so callers don't mistake a failure for a source that delisted everything.
+    """
+    logging.info(f"{spec.name}: Starting crawl ({spec.strategy})")
+    watermark_store = get_watermark_store()
+    watermark = watermark_store.get(spec.key)
+    full_crawl = watermark.needs_full_crawl()
+    logging.info(f"{spec.name}: Crawl mode: {'full' if full_crawl else 'incremental'}.")
+    pages = Counter() # outcome -> listing pages this crawl
+    entries, complete = _STRATEGIES[spec.strategy](spec, watermark, full_crawl, pages)
+    if full_crawl and not complete:
+        # Some pages failed: merge what we got rather than replace the listing with a partial one
+        logging.warning(f"{spec.name}: Some pages failed; merging this full crawl into the stored listing.")
+    # Update the high-water mark; incremental results are merged into the stored listing
+    listing, new_count = watermark.record(entries, full_crawl and complete)
+    watermark_store.save()
+    logging.info(f"{spec.name}: Crawl finished: {len(entries)} unique items ({new_count} new, {len(listing)} in listing); "
+                 f"{pages['unchanged'] + pages['not_modified']}/{sum(pages.values())} pages reused without parsing.")
+    return {"data": listing}
@@ -1,17 +1,93 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from metrics import DRIVER_STARTUP_SECONDS
+
+# --- Pool Configuration ---
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_PAGES = 50 # Recycle a browser after this many page loads
+DRIVER_MAX_RSS_MB = 700 # Recycle a browser whose process tree grows beyond this
+DRIVER_ACQUIRE_TIMEOUT_SECONDS = 120
+DRIVER_LEAN_MODE = os.environ.get("DRIVER_LEAN_MODE", "1") == "1" # Block heavy resources; see LEAN_* below
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36" # EXAMPLE - Replace with current
+
+# --- Lean Mode: resources the scrapers never need (we only read the DOM) ---
+LEAN_BLOCKED_EXTENSIONS = [
+    # Images and media (image URLs are read from the src attribute, not downloaded)
+    "jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico",
+    "mp4", "webm", "m3u8", "mp3",
+    # Fonts
+    "woff", "woff2", "ttf", "otf", "eot",
+]
+LEAN_BLOCKED_HOST_PATTERNS = [
+    # Ad, analytics and tracker hosts
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googletagservices.com*",
+    "*amazon-adsystem.com*", "*facebook.net*", "*connect.facebook.*", "*scorecardresearch.com*",
+    "*taboola.com*", "*outbrain.com*", "*criteo.*", "*chartbeat.*", "*hotjar.*", "*quantserve.com*",
+    "*moatads.com*", "*izooto.com*", "*clevertap*", "*moengage*", "*colombiaonline.com*", "*vdo.ai*",
+]
+# Per-source exceptions: extensions or host patterns from the lists above that must stay allowed for that source
+LEAN_SOURCE_ALLOWLISTS = {
+    "ndtv": [],
+    "ani": [],
+}
+LEAN_CHROME_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions,AutofillServerCommunication",
+    "--mute-audio",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--autoplay-policy=user-gesture-required",
+]
+LEAN_CHROME_PREFS = {
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.popups": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "credentials_enable_service": False,
+    "profile.password_manager_enabled": False,
+}
+
+_chromedriver_path = None
+_chromedriver_path_lock = threading.Lock()
+
+
+def get_chromedriver_path():
+    """Resolves the chromedriver binary once per process; ChromeDriverManager().install() does a network lookup."""
+    global _chromedriver_path
+    with _chromedriver_path_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
 
-def setup_driver():
+
+def setup_driver(lean=DRIVER_LEAN_MODE):
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36" # EXAMPLE - Replace with current
+    user_agent = USER_AGENT # Shared with the HTTP fetcher so both paths look the same to the sites
     # print(f"  Using User-Agent: {user_agent}")
     chrome_options.add_argument(f'user-agent={user_agent}')
 
@@ -22,9 +98,306 @@ def setup_driver():
     chrome_options.add_argument("--disable-extensions")
     chrome_options.add_argument("--disable-infobars")
     chrome_options.binary_location = "/usr/bin/google-chrome-stable"
-    
+
+    # 4. Lean mode: switch off Chrome features a scraper never uses
+    if lean:
+        for argument in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", LEAN_CHROME_PREFS)
+
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=Service(get_chromedriver_path()),
         options=chrome_options
     )
-    return driver
\ No newline at end of file
+    if lean:
+        apply_resource_blocking(driver, None)
+    return driver
+
+
+def apply_resource_blocking(driver, source):
+    """
+    Blocks the LEAN_BLOCKED_* extensions and hosts through CDP network interception, minus
+    `source`'s allowlist. Blocked requests fail instantly inside Chrome, so they cost no
+    bandwidth or load time.
+    """
+    allowed = set(LEAN_SOURCE_ALLOWLISTS.get(source, []))
+    patterns = []
+    for extension in LEAN_BLOCKED_EXTENSIONS:
+        if extension not in allowed:
+            # Patterns match the whole URL, so cover query strings (e.g. resized image URLs) too
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+    patterns += [pattern for pattern in LEAN_BLOCKED_HOST_PATTERNS if pattern not in allowed]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+# --- Condition-Based Waits ---
+WAIT_POLL_INTERVAL_SECONDS = 0.2
+
+
+def wait_for_selector(driver, css_selector, timeout):
+    """
+    Waits until an element matching `css_selector` is present, up to `timeout` seconds.
+    Returns (found, waited_seconds) so callers can report how long the page actually took.
+    """
+    start = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL_SECONDS).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+        )
+        return True, time.monotonic() - start
+    except TimeoutException:
+        return False, time.monotonic() - start
+
+
+def count_elements(driver, css_selector):
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", css_selector)
+
+
+def element_attributes(driver, css_selector, attribute, start=0, end=None):
+    """Returns `attribute` of the matching elements in [start, end) without transferring the page source."""
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0])).slice(arguments[2], arguments[3] === null ? undefined : arguments[3]).map(e => e.getAttribute(arguments[1]));",
+        css_selector, attribute, start, end,
+    )
+
+
+def scroll_until_stable(driver, item_selector, max_scrolls, settle_timeout, max_seconds, stop_when=None):
+    """
+    Infinite-scroll helper: scrolls to the bottom and waits for more `item_selector` elements.
+    Each scroll finishes as soon as the item count grows; scrolling stops once a scroll adds
+    nothing within `settle_timeout`, after `max_scrolls`, or when `max_seconds` is spent.
+    `stop_when(driver, start, end)` is called with the index range of each newly loaded batch
+    (starting with the initial items) and stops scrolling early when it returns True.
+    Returns (scrolls, item_count, waited_seconds).
+    """
+    start = time.monotonic()
+    item_count = count_elements(driver, item_selector)
+    scrolls = 0
+    if stop_when is not None and stop_when(driver, 0, item_count):
+        return scrolls, item_count, time.monotonic() - start
+    while scrolls < max_scrolls and time.monotonic() - start < max_seconds:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        scrolls += 1
+        scroll_deadline = min(time.monotonic() + settle_timeout, start + max_seconds)
+        new_count = item_count
+        while time.monotonic() < scroll_deadline:
+            time.sleep(WAIT_POLL_INTERVAL_SECONDS)
+            new_count = count_elements(driver, item_selector)
+            if new_count > item_count:
+                break
+        if new_count <= item_count:
+            break # DOM item count stabilized: nothing more is loading
+        previous_count, item_count = item_count, new_count
+        if stop_when is not None and stop_when(driver, previous_count, item_count):
+            break
+    return scrolls, item_count, time.monotonic() - start
+
+
+def _process_tree_rss_bytes(root_pid):
+    """Sums VmRSS of `root_pid` and all its descendants via /proc. Returns 0 where /proc is unavailable."""
+    children = {}
+    rss = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    # The command name may contain spaces, so split after its closing paren
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                with open(f"/proc/{entry}/statm", "r") as f:
+                    rss[int(entry)] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue # Process exited while we were reading it
+    except OSError:
+        return 0
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class PooledDriver:
+    """
+    A pooled WebDriver. Attribute access is forwarded to the underlying Chrome driver,
+    so scrapers use it exactly like the object returned by setup_driver(); get() also
+    counts page loads for recycling.
+    """
+
+    def __init__(self, driver, lean):
+        self._driver = driver
+        self.lean = lean
+        self.pages_loaded = 0
+        self.blocking_source = None # Source whose allowlist is currently applied
+
+    def use_for_source(self, source):
+        """Applies `source`'s resource allowlist if this is a lean browser and it isn't applied yet."""
+        if self.lean and source != self.blocking_source:
+            apply_resource_blocking(self._driver, source)
+            self.blocking_source = source
+
+    def get(self, url):
+        self.pages_loaded += 1
+        return self._driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def rss_bytes(self):
+        service_process = getattr(getattr(self._driver, "service", None), "process", None)
+        if service_process is None:
+            return 0
+        return _process_tree_rss_bytes(service_process.pid)
+
+    def is_healthy(self):
+        try:
+            return self._driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self._driver.quit()
+        except Exception as e:
+            logging.warning(f"Driver pool: error quitting browser: {e}")
+
+
+class DriverPool:
+    """
+    Keeps up to `size` warm headless Chrome instances and hands them out with session().
+    Browsers that fail a health check, crossed `max_pages` page loads or grew past
+    `max_rss_mb` are quit and replaced instead of being returned to the pool.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB, lean=DRIVER_LEAN_MODE):
+        self.size = size
+        self.lean = lean
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self._idle = queue.LifoQueue() # LIFO keeps the most recently used (warmest) browser busy
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def warm_up(self):
+        """Starts browsers until `size` are idle, so the first scrape doesn't pay Chrome cold start."""
+        while True:
+            with self._lock:
+                if self._closed or self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._new_driver())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def _new_driver(self):
+        logging.info("Driver pool: starting a new Chrome instance...")
+        with DRIVER_STARTUP_SECONDS.time():
+            driver = setup_driver(lean=self.lean)
+        return PooledDriver(driver, lean=self.lean)
+
+    def acquire(self, timeout=DRIVER_ACQUIRE_TIMEOUT_SECONDS):
+        """Returns a healthy PooledDriver, starting one if the pool is below `size`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._new_driver()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No pooled browser became available within {timeout}s")
+                try:
+                    # Short waits so a slot freed by a recycled browser is noticed promptly
+                    pooled = self._idle.get(timeout=min(1.0, remaining))
+                except queue.Empty:
+                    continue
+            if pooled.is_healthy():
+                return pooled
+            logging.warning("Driver pool: browser failed health check, replacing it.")
+            self._discard(pooled)
+
+    def release(self, pooled, broken=False):
+        """Returns a browser to the pool, or recycles it if it is broken or over its limits."""
+        if broken or self._closed:
+            self._discard(pooled)
+            return
+        if pooled.pages_loaded >= self.max_pages:
+            logging.info(f"Driver pool: recycling browser after {pooled.pages_loaded} page loads.")
+            self._discard(pooled)
+            return
+        rss = pooled.rss_bytes()
+        if rss > self.max_rss_bytes:
+            logging.info(f"Driver pool: recycling browser using {rss / (1024 * 1024):.0f} MB RSS.")
+            self._discard(pooled)
+            return
+        try:
+            # Drop the previous page so an idle browser doesn't keep its DOM and timers alive
+            pooled._driver.get("about:blank")
+        except Exception:
+            self._discard(pooled)
+            return
+        self._idle.put(pooled)
+
+    def _discard(self, pooled):
+        pooled.quit()
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def session(self, source=None):
+        """
+        Context manager yielding a pooled driver; the driver is recycled if the block raises.
+        `source` selects the per-source resource allowlist in lean mode.
+        """
+        pooled = self.acquire()
+        broken = False
+        try:
+            pooled.use_for_source(source)
+            yield pooled
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """Quits every idle browser; browsers still in use are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Returns the process-wide DriverPool, creating it on first use."""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+            atexit.register(_driver_pool.close)
+        return _driver_pool
@@ -0,0 +1,156 @@
+import logging
+import re
+import threading
+import time
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from driver import USER_AGENT, get_driver_pool
+from metrics import PAGE_LOAD_SECONDS, SCRAPE_ERRORS
+
+# --- HTTP Configuration ---
+HTTP_TIMEOUT_SECONDS = 15.0
+HTTP_MAX_CONNECTIONS = 10
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 5
+
+# --- Politeness per domain (HTTP and browser combined; sources sharing a domain share its limits) ---
+DOMAIN_CONCURRENCY = { # Max concurrent fetches
+    "www.aninews.in": 3,
+    "www.ndtv.com": 1,
+}
+DEFAULT_DOMAIN_CONCURRENCY = 2
+DOMAIN_CRAWL_DELAY_SECONDS = { # Min spacing between request starts
+    "www.aninews.in": 0.25,
+}
+DEFAULT_DOMAIN_CRAWL_DELAY_SECONDS = 0.5
+DOMAIN_SLOT_TIMEOUT_SECONDS = 60 # Max wait for a slot; a fetch that can't get one fails instead of queueing forever
+
+_http_client = None
+_http_client_lock = threading.Lock()
+_domain_slots = {}
+_domain_slots_lock = threading.Lock()
+
+
+class DomainSlot:
+    """
+    Context manager admitting at most `concurrency` fetches to one domain, started at least `delay`
+    seconds apart. Raises TimeoutError if no slot frees up within `timeout` seconds.
+    """
+
+    def __init__(self, concurrency, delay, timeout=DOMAIN_SLOT_TIMEOUT_SECONDS):
+        self.delay = delay
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No fetch slot for the domain became free within {self.timeout}s")
+        if self.delay:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._semaphore.release()
+
+
+def domain_slot(url):
+    """Returns the DomainSlot enforcing the politeness limits of `url`'s domain."""
+    domain = urlsplit(url).netloc.lower()
+    with _domain_slots_lock:
+        slot = _domain_slots.get(domain)
+        if slot is None:
+            slot = DomainSlot(DOMAIN_CONCURRENCY.get(domain, DEFAULT_DOMAIN_CONCURRENCY),
+                              DOMAIN_CRAWL_DELAY_SECONDS.get(domain, DEFAULT_DOMAIN_CRAWL_DELAY_SECONDS))
+            _domain_slots[domain] = slot
+        return slot
+
+
+def get_http_client():
+    """Returns the process-wide keep-alive HTTP client, creating it on first use."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.9",
+                },
+                timeout=HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return _http_client
+
+
+def element_pattern(tag, css_class):
+    """
+    Compiles a regex that finds a `tag` whose class attribute contains `css_class`.
+    Used to check that a listing rendered server-side without building a parse tree.
+    """
+    return re.compile(
+        rf"<{tag}\b[^>]*\bclass\s*=\s*[\"'][^\"']*(?<![\w-]){re.escape(css_class)}(?![\w-])",
+        re.IGNORECASE,
+    )
+
+
+class FetchResult(NamedTuple):
+    html: str
+    via: str # "http", "browser", "not-modified" (HTTP 304, `html` is empty) or "" when both failed
+    etag: str | None = None # HTTP validators of the response, for the next conditional request
+    last_modified: str | None = None
+
+
+def fetch_html(url, expected_pattern, browser_loader=None, source="", etag=None, last_modified=None):
+    """
+    Fetches `url` over the pooled HTTP client and returns a FetchResult.
+    With an `etag` or `last_modified` from an earlier response the request is conditional, and a
+    304 comes back as via="not-modified" so the caller can reuse what it parsed then.
+    If the request fails or the response doesn't contain `expected_pattern` (e.g. the
+    listing is rendered by JavaScript or a bot wall was served), `browser_loader(driver, url)`
+    is run on a pooled WebDriver instead.
+    At most DOMAIN_CONCURRENCY fetches per domain run at once, across all threads, with starts
+    spaced by DOMAIN_CRAWL_DELAY_SECONDS.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with domain_slot(url):
+        try:
+            start = time.perf_counter()
+            response = get_http_client().get(url, headers=headers)
+            if response.status_code == 304 and headers:
+                PAGE_LOAD_SECONDS.labels(source, "http").observe(time.perf_counter() - start)
+                return FetchResult("", "not-modified", response.headers.get("ETag", etag),
+                                   response.headers.get("Last-Modified", last_modified))
+            if response.status_code == 200 and expected_pattern.search(response.text):
+                PAGE_LOAD_SECONDS.labels(source, "http").observe(time.perf_counter() - start)
+                return FetchResult(response.text, "http", response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            logging.info(f"Fetcher [{source}]: HTTP {response.status_code} without expected listing for {url}, falling back to browser.")
+        except httpx.HTTPError as e:
+            logging.info(f"Fetcher [{source}]: HTTP request failed for {url} ({e}), falling back to browser.")
+
+        if browser_loader is None:
+            return FetchResult("", "")
+        try:
+            with get_driver_pool().session(source=source) as driver:
+                html = browser_loader(driver, url)
+        except Exception as e:
+            logging.error(f"Fetcher [{source}]: browser fallback failed for {url}: {e}")
+            SCRAPE_ERRORS.labels(source, "browser").inc()
+            return FetchResult("", "")
+        return FetchResult(html, "browser") if html else FetchResult("", "")
@@ -0,0 +1,310 @@
+import re
+import unicodedata
+from collections import deque
+
+# --- Specificity Levels ---
+# Higher wins when a headline mentions several places ("Rohini, Delhi" -> "Rohini")
+LEVEL_CITY = 1      # Delhi / NCR as a whole
+LEVEL_DISTRICT = 2  # Delhi police districts and the surrounding NCR cities
+LEVEL_LOCALITY = 3  # Localities, police-station areas and landmarks
+
+# --- Gazetteer: canonical name -> (level, aliases) ---
+# The canonical name is always matched too; aliases cover alternate spellings and abbreviations.
+DELHI_NCR_GAZETTEER = {
+    # Delhi as a whole
+    "Delhi": (LEVEL_CITY, ["Dilli", "Delhi NCR", "NCR", "National Capital Region", "NCT of Delhi"]),
+
+    # Delhi police districts
+    "New Delhi": (LEVEL_DISTRICT, ["New Delhi district", "Lutyens Delhi", "Lutyens' Delhi"]),
+    "Central Delhi": (LEVEL_DISTRICT, []),
+    "North Delhi": (LEVEL_DISTRICT, []),
+    "South Delhi": (LEVEL_DISTRICT, []),
+    "East Delhi": (LEVEL_DISTRICT, []),
+    "West Delhi": (LEVEL_DISTRICT, []),
+    "North East Delhi": (LEVEL_DISTRICT, ["Northeast Delhi", "North-East Delhi"]),
+    "North West Delhi": (LEVEL_DISTRICT, ["Northwest Delhi", "North-West Delhi"]),
+    "South East Delhi": (LEVEL_DISTRICT, ["Southeast Delhi", "South-East Delhi"]),
+    "South West Delhi": (LEVEL_DISTRICT, ["Southwest Delhi", "South-West Delhi"]),
+    "Outer Delhi": (LEVEL_DISTRICT, []),
+    "Outer North Delhi": (LEVEL_DISTRICT, []),
+    "Shahdara": (LEVEL_DISTRICT, ["Shahdra"]),
+
+    # NCR cities
+    "Noida": (LEVEL_DISTRICT, ["Gautam Buddh Nagar", "Gautam Budh Nagar"]),
+    "Greater Noida": (LEVEL_DISTRICT, ["Greater Noida West", "Noida Extension"]),
+    "Ghaziabad": (LEVEL_DISTRICT, []),
+    "Gurugram": (LEVEL_DISTRICT, ["Gurgaon"]),
+    "Faridabad": (LEVEL_DISTRICT, []),
+    "Sonipat": (LEVEL_DISTRICT, ["Sonepat"]),
+    "Bahadurgarh": (LEVEL_DISTRICT, []),
+    "Manesar": (LEVEL_DISTRICT, []),
+    "Ballabhgarh": (LEVEL_DISTRICT, ["Ballabgarh"]),
+    "Palwal": (LEVEL_DISTRICT, []),
+    "Sohna": (LEVEL_DISTRICT, []),
+    "Loni": (LEVEL_DISTRICT, []),
+
+    # NCR localities
+    "Indirapuram": (LEVEL_LOCALITY, []),
+    "Vaishali": (LEVEL_LOCALITY, []),
+    "Vasundhara": (LEVEL_LOCALITY, []),
+    "Sahibabad": (LEVEL_LOCALITY, []),
+    "Kaushambi": (LEVEL_LOCALITY, []),
+    "Raj Nagar Extension": (LEVEL_LOCALITY, []),
+    "Cyber City": (LEVEL_LOCALITY, ["DLF Cyber City", "Cyber Hub"]),
+    "Golf Course Road": (LEVEL_LOCALITY, []),
+    "Sohna Road": (LEVEL_LOCALITY, []),
+    "Udyog Vihar": (LEVEL_LOCALITY, []),
+
+    # Central / New Delhi
+    "Connaught Place": (LEVEL_LOCALITY, ["Rajiv Chowk"]),
+    "Chanakyapuri": (LEVEL_LOCALITY, []),
+    "Parliament Street": (LEVEL_LOCALITY, []),
+    "Tughlak Road": (LEVEL_LOCALITY, []),
+    "Mandir Marg": (LEVEL_LOCALITY, []),
+    "Barakhamba Road": (LEVEL_LOCALITY, []),
+    "ITO": (LEVEL_LOCALITY, []),
+    "India Gate": (LEVEL_LOCALITY, []),
+    "Karol Bagh": (LEVEL_LOCALITY, []),
+    "Paharganj": (LEVEL_LOCALITY, []),
+    "Daryaganj": (LEVEL_LOCALITY, []),
+    "Chandni Chowk": (LEVEL_LOCALITY, []),
+    "Chandni Mahal": (LEVEL_LOCALITY, []),
+    "Jama Masjid": (LEVEL_LOCALITY, []),
+    "Red Fort": (LEVEL_LOCALITY, ["Lal Qila"]),
+    "Lahori Gate": (LEVEL_LOCALITY, []),
+    "Hauz Qazi": (LEVEL_LOCALITY, []),
+    "Kashmere Gate": (LEVEL_LOCALITY, ["Kashmiri Gate"]),
+    "Sadar Bazar": (LEVEL_LOCALITY, ["Sadar Bazaar"]),
+    "Kamla Market": (LEVEL_LOCALITY, []),
+    "Rajinder Nagar": (LEVEL_LOCALITY, ["Old Rajinder Nagar", "Rajendra Nagar"]),
+    "Patel Nagar": (LEVEL_LOCALITY, []),
+    "Prasad Nagar": (LEVEL_LOCALITY, []),
+    "Anand Parbat": (LEVEL_LOCALITY, []),
+    "Ranjit Nagar": (LEVEL_LOCALITY, []),
+    "Naraina": (LEVEL_LOCALITY, []),
+    "Inderpuri": (LEVEL_LOCALITY, []),
+    "Sarojini Nagar": (LEVEL_LOCALITY, []),
+    "Lodhi Colony": (LEVEL_LOCALITY, ["Lodhi Road"]),
+    "Jangpura": (LEVEL_LOCALITY, ["Bhogal"]),
+    "Nizamuddin": (LEVEL_LOCALITY, ["Hazrat Nizamuddin"]),
+
+    # North / North West / Outer
+    "Civil Lines": (LEVEL_LOCALITY, []),
+    "Timarpur": (LEVEL_LOCALITY, []),
+    "Mukherjee Nagar": (LEVEL_LOCALITY, []),
+    "Burari": (LEVEL_LOCALITY, []),
+    "Model Town": (LEVEL_LOCALITY, []),
+    "Azadpur": (LEVEL_LOCALITY, ["Azadpur Mandi"]),
+    "Adarsh Nagar": (LEVEL_LOCALITY, []),
+    "Jahangirpuri": (LEVEL_LOCALITY, ["Jahangir Puri"]),
+    "Alipur": (LEVEL_LOCALITY, []),
+    "Narela": (LEVEL_LOCALITY, []),
+    "Bawana": (LEVEL_LOCALITY, []),
+    "Samaypur Badli": (LEVEL_LOCALITY, ["Samaypur", "Badli"]),
+    "Shalimar Bagh": (LEVEL_LOCALITY, []),
+    "Pitampura": (LEVEL_LOCALITY, ["Pitam Pura"]),
+    "Ashok Vihar": (LEVEL_LOCALITY, []),
+    "Wazirpur": (LEVEL_LOCALITY, []),
+    "Keshav Puram": (LEVEL_LOCALITY, ["Keshavpuram"]),
+    "Rohini": (LEVEL_LOCALITY, []),
+    "Prashant Vihar": (LEVEL_LOCALITY, []),
+    "Vijay Vihar": (LEVEL_LOCALITY, []),
+    "Aman Vihar": (LEVEL_LOCALITY, []),
+    "Prem Nagar": (LEVEL_LOCALITY, []),
+    "Begumpur": (LEVEL_LOCALITY, []),
+    "Kanjhawala": (LEVEL_LOCALITY, []),
+    "Mangolpuri": (LEVEL_LOCALITY, ["Mangol Puri"]),
+    "Sultanpuri": (LEVEL_LOCALITY, ["Sultan Puri"]),
+    "Mundka": (LEVEL_LOCALITY, []),
+    "Nangloi": (LEVEL_LOCALITY, []),
+    "Ranhola": (LEVEL_LOCALITY, []),
+    "Nihal Vihar": (LEVEL_LOCALITY, []),
+    "Paschim Vihar": (LEVEL_LOCALITY, []),
+    "Punjabi Bagh": (LEVEL_LOCALITY, []),
+    "Mianwali Nagar": (LEVEL_LOCALITY, []),
+
+    # West / South West / Dwarka
+    "Rajouri Garden": (LEVEL_LOCALITY, []),
+    "Tilak Nagar": (LEVEL_LOCALITY, []),
+    "Hari Nagar": (LEVEL_LOCALITY, []),
+    "Tihar": (LEVEL_LOCALITY, ["Tihar Jail"]),
+    "Moti Nagar": (LEVEL_LOCALITY, []),
+    "Kirti Nagar": (LEVEL_LOCALITY, []),
+    "Mayapuri": (LEVEL_LOCALITY, []),
+    "Janakpuri": (LEVEL_LOCALITY, ["Janak Puri"]),
+    "Vikaspuri": (LEVEL_LOCALITY, ["Vikas Puri"]),
+    "Uttam Nagar": (LEVEL_LOCALITY, []),
+    "Bindapur": (LEVEL_LOCALITY, []),
+    "Dabri": (LEVEL_LOCALITY, []),
+    "Palam": (LEVEL_LOCALITY, []),
+    "Dwarka": (LEVEL_LOCALITY, []),
+    "Najafgarh": (LEVEL_LOCALITY, []),
+    "Chhawla": (LEVEL_LOCALITY, []),
+    "Jaffarpur Kalan": (LEVEL_LOCALITY, []),
+    "Baba Haridas Nagar": (LEVEL_LOCALITY, []),
+    "Kapashera": (LEVEL_LOCALITY, []),
+    "Mahipalpur": (LEVEL_LOCALITY, []),
+    "IGI Airport": (LEVEL_LOCALITY, ["Delhi Airport", "Indira Gandhi International Airport", "IGI"]),
+    "Vasant Vihar": (LEVEL_LOCALITY, []),
+    "Vasant Kunj": (LEVEL_LOCALITY, []),
+    "RK Puram": (LEVEL_LOCALITY, ["R K Puram", "R.K. Puram", "Rama Krishna Puram"]),
+    "Munirka": (LEVEL_LOCALITY, []),
+    "JNU": (LEVEL_LOCALITY, ["Jawaharlal Nehru University"]),
+    "Kishangarh": (LEVEL_LOCALITY, []),
+
+    # South / South East
+    "Saket": (LEVEL_LOCALITY, []),
+    "Mehrauli": (LEVEL_LOCALITY, []),
+    "Chhatarpur": (LEVEL_LOCALITY, []),
+    "Fatehpur Beri": (LEVEL_LOCALITY, []),
+    "Neb Sarai": (LEVEL_LOCALITY, []),
+    "Sangam Vihar": (LEVEL_LOCALITY, []),
+    "Ambedkar Nagar": (LEVEL_LOCALITY, []),
+    "Hauz Khas": (LEVEL_LOCALITY, []),
+    "Malviya Nagar": (LEVEL_LOCALITY, []),
+    "Greater Kailash": (LEVEL_LOCALITY, ["GK-1", "GK-2", "GK 1", "GK 2"]),
+    "Chittaranjan Park": (LEVEL_LOCALITY, ["CR Park", "C R Park"]),
+    "Kalkaji": (LEVEL_LOCALITY, []),
+    "Govindpuri": (LEVEL_LOCALITY, ["Govind Puri"]),
+    "Lajpat Nagar": (LEVEL_LOCALITY, []),
+    "Amar Colony": (LEVEL_LOCALITY, []),
+    "Defence Colony": (LEVEL_LOCALITY, []),
+    "Kotla Mubarakpur": (LEVEL_LOCALITY, []),
+    "Sriniwaspuri": (LEVEL_LOCALITY, ["Srinivaspuri"]),
+    "Sunlight Colony": (LEVEL_LOCALITY, []),
+    "New Friends Colony": (LEVEL_LOCALITY, ["NFC"]),
+    "Okhla": (LEVEL_LOCALITY, ["Okhla Industrial Area"]),
+    "Jamia Nagar": (LEVEL_LOCALITY, ["Jamia"]),
+    "Shaheen Bagh": (LEVEL_LOCALITY, []),
+    "Kalindi Kunj": (LEVEL_LOCALITY, []),
+    "Sarita Vihar": (LEVEL_LOCALITY, []),
+    "Jaitpur": (LEVEL_LOCALITY, []),
+    "Badarpur": (LEVEL_LOCALITY, []),
+    "Sarai Kale Khan": (LEVEL_LOCALITY, []),
+
+    # East / North East / Shahdara
+    "Mayur Vihar": (LEVEL_LOCALITY, []),
+    "Laxmi Nagar": (LEVEL_LOCALITY, ["Lakshmi Nagar"]),
+    "Shakarpur": (LEVEL_LOCALITY, []),
+    "Pandav Nagar": (LEVEL_LOCALITY, []),
+    "Preet Vihar": (LEVEL_LOCALITY, []),
+    "Kalyanpuri": (LEVEL_LOCALITY, []),
+    "Trilokpuri": (LEVEL_LOCALITY, []),
+    "Kondli": (LEVEL_LOCALITY, []),
+    "New Ashok Nagar": (LEVEL_LOCALITY, []),
+    "Mandawali": (LEVEL_LOCALITY, []),
+    "Ghazipur": (LEVEL_LOCALITY, []),
+    "Geeta Colony": (LEVEL_LOCALITY, []),
+    "Krishna Nagar": (LEVEL_LOCALITY, []),
+    "Gandhi Nagar": (LEVEL_LOCALITY, []),
+    "Vivek Vihar": (LEVEL_LOCALITY, []),
+    "Anand Vihar": (LEVEL_LOCALITY, []),
+    "Jagatpuri": (LEVEL_LOCALITY, []),
+    "Seemapuri": (LEVEL_LOCALITY, []),
+    "Dilshad Garden": (LEVEL_LOCALITY, []),
+    "Nand Nagri": (LEVEL_LOCALITY, []),
+    "Harsh Vihar": (LEVEL_LOCALITY, []),
+    "Jyoti Nagar": (LEVEL_LOCALITY, []),
+    "Seelampur": (LEVEL_LOCALITY, []),
+    "Jafrabad": (LEVEL_LOCALITY, ["Zafrabad"]),
+    "Welcome Colony": (LEVEL_LOCALITY, []),
+    "Gokulpuri": (LEVEL_LOCALITY, ["Gokalpuri"]),
+    "Bhajanpura": (LEVEL_LOCALITY, []),
+    "Khajuri Khas": (LEVEL_LOCALITY, []),
+    "Dayalpur": (LEVEL_LOCALITY, []),
+    "Karawal Nagar": (LEVEL_LOCALITY, []),
+    "Sonia Vihar": (LEVEL_LOCALITY, []),
+    "Mustafabad": (LEVEL_LOCALITY, []),
+    "Brijpuri": (LEVEL_LOCALITY, []),
+    "Maujpur": (LEVEL_LOCALITY, []),
+    "Yamuna Vihar": (LEVEL_LOCALITY, []),
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokenize(text: str) -> list:
+    """Lowercased word tokens; punctuation and hyphens act as separators ("R.K. Puram" -> r, k, puram)."""
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class LocationMatcher:
+    """
+    Word-level Aho-Corasick automaton over the gazetteer.
+    Matching on whole tokens gives word boundaries for free, so "Loni" never matches
+    inside "colonies". One pass over the headline finds every alias occurrence.
+    """
+
+    def __init__(self, gazetteer: dict):
+        self._goto = [{}]   # state -> {token: next_state}
+        self._fail = [0]
+        self._output = [[]] # state -> [(canonical, level, alias_length)]
+        for canonical, (level, aliases) in gazetteer.items():
+            for alias in [canonical, *aliases]:
+                tokens = _tokenize(alias)
+                if tokens:
+                    self._add(tokens, (canonical, level, len(tokens)))
+        self._build_failure_links()
+
+    def _add(self, tokens: list, payload: tuple):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(payload)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit matches that end here via the suffix link ("north delhi" also emits "delhi")
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> list:
+        """Returns [(canonical, level, start_token, end_token)] for every gazetteer hit in `text`."""
+        matches = []
+        state = 0
+        for index, token in enumerate(_tokenize(text)):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for canonical, level, length in self._output[state]:
+                matches.append((canonical, level, index - length + 1, index + 1))
+        return matches
+
+    def extract(self, text: str) -> str | None:
+        """
+        Returns the most specific location mentioned in `text`, or None.
+        Ties on specificity go to the longer alias, then to the earliest mention.
+        """
+        best = None
+        best_rank = None
+        for canonical, level, start, end in self.find_all(text):
+            rank = (level, end - start, -start)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = canonical, rank
+        return best
+
+
+_default_matcher = None
+
+
+def extract_location(headline: str) -> str | None:
+    """Extracts the most specific Delhi NCR location from a headline using the built-in gazetteer."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = LocationMatcher(DELHI_NCR_GAZETTEER)
+    return _default_matcher.extract(headline or "")
@@ -0,0 +1,90 @@
+import re
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Date/time formats the scrapers produce:
+#   NDTV: date "Mar18,2025",   time "12:45pm"
+#   ANI:  date "Jun 10, 2024", time "15:30" or "8:29 AM"
+_DATE_FORMATS = ("%b%d,%Y", "%b %d, %Y", "%B %d, %Y", "%B%d,%Y")
+_TIME_FORMATS = ("%I:%M%p", "%H:%M", "%I:%M")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def parse_item_datetime(date_text, time_text):
+    """Parses a scraped item's "date"/"time" fields. Returns a naive IST datetime, or None if unparseable."""
+    if not date_text or date_text == "N/A":
+        return None
+    date_text = date_text.strip()
+    parsed_date = None
+    for date_format in _DATE_FORMATS:
+        try:
+            parsed_date = datetime.strptime(date_text, date_format)
+            break
+        except ValueError:
+            continue
+    if parsed_date is None:
+        return None
+    if time_text and time_text != "N/A":
+        compact_time = _SPACE_RE.sub("", time_text).upper()
+        for time_format in _TIME_FORMATS:
+            try:
+                parsed_time = datetime.strptime(compact_time, time_format)
+                return parsed_date.replace(hour=parsed_time.hour, minute=parsed_time.minute)
+            except ValueError:
+                continue
+    return parsed_date
+
+
+def item_timestamp(item):
+    """Sort key for newest-first ordering: epoch seconds of the item's publish time, 0 if unknown."""
+    parsed = parse_item_datetime(item.get("date"), item.get("time"))
+    return parsed.timestamp() if parsed else 0.0
+
+
+# --- Deterministic IDs ---
+# Query parameters that only track the referrer; they don't change the article
+_TRACKING_PARAM_RE = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|mc_cid|mc_eid|ref|ref_src|fromnews|pfrom)$", re.IGNORECASE)
+
+
+def canonical_url(url):
+    """
+    Canonical form of an article URL: https, lowercase host without "www.", no fragment,
+    no tracking parameters, sorted query and no trailing slash.
+    """
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING_PARAM_RE.match(key)))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def item_id(url):
+    """Stable item ID: a UUIDv5 of the canonical article URL, so an article keeps its ID across cycles."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, canonical_url(url)))
+
+
+# --- Per-Cycle Diffing ---
+class ListingDiff(NamedTuple):
+    added: list # New IDs, or known IDs whose headline changed
+    unchanged: list
+    removed: list # Items of the previous listing missing from the current one
+
+
+def diff_listing(previous, current):
+    """Classifies the `current` raw items against the `previous` listing ({id: raw item}) by ID."""
+    added, unchanged, current_ids = [], [], set()
+    for item in current:
+        if item["id"] in current_ids: continue
+        current_ids.add(item["id"])
+        before = previous.get(item["id"])
+        if before is not None and before.get("content") == item.get("content"):
+            unchanged.append(item)
+        else:
+            added.append(item)
+    removed = [item for item_id_, item in previous.items() if item_id_ not in current_ids]
+    return ListingDiff(added, unchanged, removed)
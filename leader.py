@@ -0,0 +1,40 @@
+import fcntl
+import os
+
+
+class LeaderLock:
+    """
+    Exclusive advisory lock on a file, held by the one process that runs the refresh cycle
+    (a uvicorn worker or refresher.py). The OS drops it when the holder exits, so another
+    process can take over without stale-lock cleanup.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self, blocking=False):
+        """Takes the lock; returns False if another process holds it (only when not `blocking`)."""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # The holder's PID, for whoever wonders which process is scraping
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
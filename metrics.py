@@ -0,0 +1,109 @@
+import atexit
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set (before start, to an empty directory shared by every process),
+# each process writes its samples there and /metrics in any API worker reports all of them,
+# including the refresher's scraper, Groq and scheduler series. Gauges declare how they combine.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# --- Scraping ---
+DRIVER_STARTUP_SECONDS = Histogram(
+    "sentinal_driver_startup_seconds", "Time to start a pooled Chrome instance.",
+    buckets=(0.5, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+PAGE_LOAD_SECONDS = Histogram(
+    "sentinal_page_load_seconds", "Time to load a listing page until its items are present.",
+    ["source", "via"], buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+SCROLL_SECONDS = Histogram(
+    "sentinal_scroll_seconds", "Time spent scrolling a listing until it stopped growing.",
+    ["source"], buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30),
+)
+PARSE_SECONDS = Histogram(
+    "sentinal_parse_seconds", "Time to parse one listing page.",
+    ["source", "backend"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+SCRAPE_SECONDS = Histogram(
+    "sentinal_scrape_seconds", "Wall time of one source's scrape within a cycle.",
+    ["source"], buckets=(1, 2, 5, 10, 20, 30, 60, 90, 120, 180),
+)
+SCRAPED_ITEMS = Gauge("sentinal_scraped_items", "Items in the source's last scraped listing.", ["source"],
+                      multiprocess_mode="mostrecent")
+SCRAPE_ERRORS = Counter("sentinal_scrape_errors_total", "Scrape failures by source and stage.", ["source", "stage"])
+LISTING_PAGES = Counter(
+    "sentinal_listing_pages_total", "Listing pages by outcome: parsed, or reused as unchanged / not_modified (HTTP 304).",
+    ["source", "outcome"],
+)
+
+# --- Scheduling ---
+SOURCE_NEXT_RUN_TIMESTAMP = Gauge("sentinal_source_next_run_timestamp_seconds", "When the source's next refresh is due (epoch).", ["source"],
+                                  multiprocess_mode="mostrecent")
+SOURCE_REFRESH_INTERVAL_SECONDS = Gauge("sentinal_source_refresh_interval_seconds", "The source's current adaptive refresh interval.", ["source"],
+                                        multiprocess_mode="mostrecent")
+SOURCE_TICKS_SKIPPED = Counter("sentinal_source_ticks_skipped_total", "Refresh ticks skipped because the previous run was in flight.", ["source"])
+
+# --- Groq ---
+GROQ_REQUEST_SECONDS = Histogram(
+    "sentinal_groq_request_seconds", "Latency of one Groq chat completion attempt.",
+    ["outcome"], buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+GROQ_TOKENS = Counter("sentinal_groq_tokens_total", "Tokens reported by Groq.", ["kind"])
+GROQ_RATE_LIMITED = Counter("sentinal_groq_rate_limited_total", "Groq 429 responses.")
+GROQ_FALLBACKS = Counter(
+    "sentinal_groq_fallbacks_total", "Headlines that fell back to the default (non-crime) result.", ["reason"],
+)
+HEADLINES_ANALYZED = Counter("sentinal_headlines_analyzed_total", "Headlines classified, by where the result came from.", ["via"])
+
+# --- Cache and API ---
+# Set on each scrape of /metrics (callback gauges aren't supported in multiprocess mode)
+CACHE_AGE_SECONDS = Gauge("sentinal_cache_age_seconds", "Seconds since the published cache last changed.",
+                          multiprocess_mode="livemostrecent")
+CACHE_ITEMS = Gauge("sentinal_cache_items", "Crime items currently published.", multiprocess_mode="livemostrecent")
+REQUEST_SECONDS = Histogram(
+    "sentinal_request_seconds", "API latency until the response starts.",
+    ["path", "status"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+if MULTIPROCESS:
+    # Drops this process's "live" gauges once it exits cleanly
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def render_latest():
+    """
+    Returns (body, content type) of the current metrics in the Prometheus text format: this
+    process's, or in multiprocess mode those of every process sharing PROMETHEUS_MULTIPROC_DIR.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class RequestLatencyMiddleware:
+    """
+    ASGI middleware observing REQUEST_SECONDS for `paths` (exact match).
+    Timing stops when the response starts, so streaming bodies don't skew it.
+    """
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                REQUEST_SECONDS.labels(scope["path"], str(message["status"])).observe(time.perf_counter() - start)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
@@ -0,0 +1,179 @@
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from analysis_cache import normalize_headline
+
+# --- Configuration ---
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8 # 8 bands of 4 rows: pairs above ~0.8 Jaccard share a bucket ~98% of the time
+# Verified on the shingle sets, so LSH false positives never cluster. Word bigrams make a one-word
+# difference cost two shingles: "man arrested for murder/robbery in Rohini" scores 0.2, not 0.6
+NEAR_DUPLICATE_JACCARD = 0.8
+STORY_INDEX_MAX_ENTRIES = 2000
+STORY_INDEX_MAX_AGE_SECONDS = 48 * 3600 # Classifications older than this are never reused
+# Words that carry no story identity; "delhi" is in nearly every headline of both sources
+STOPWORDS = frozenset("""
+a an the and or of in on at to for from by with as is are was were be been after over into amid
+its his her their this that s delhi new news
+""".split())
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5E17) # Fixed, so signatures are comparable across processes and restarts
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+
+
+def _stem(token):
+    # Crude suffix stripping, enough for "arrested"/"arrests"/"arrest" to meet
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def headline_shingles(headline):
+    """Word bigrams of the headline's normalized, stemmed content words (the word itself if only one)."""
+    words = [_stem(token) for token in normalize_headline(headline).split() if token not in STOPWORDS]
+    if len(words) == 1:
+        return frozenset(words)
+    return frozenset(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def minhash(tokens):
+    """MinHash signature of a token (or shingle) set (empty for an empty set)."""
+    if not tokens:
+        return ()
+    hashes = [int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big") for token in tokens]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of token sets. add() and find() cost O(bands + candidates), so clustering n
+    headlines is linear in n. Entries beyond `max_entries` are evicted oldest first.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_JACCARD, max_entries=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (tokens, signature, value)
+        self._buckets = {} # (band, rows) -> [key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _bands(signature):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+
+    def add(self, key, tokens, value=None, signature=None):
+        """Indexes `tokens` under `key`; `signature` is minhash(tokens) if the caller already has it."""
+        signature = minhash(tokens) if signature is None else signature
+        if not signature:
+            return
+        self.remove(key)
+        self._entries[key] = (tokens, signature, value)
+        for bucket in self._bands(signature):
+            self._buckets.setdefault(bucket, []).append(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self.remove(next(iter(self._entries)))
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in self._bands(entry[1]):
+            keys = self._buckets[bucket]
+            keys.remove(key)
+            if not keys:
+                del self._buckets[bucket]
+
+    def find(self, tokens, accept=None, signature=None):
+        """
+        Returns (key, value) of the most similar entry with Jaccard >= threshold (and, if given,
+        `accept(key, value)`), or None. `signature` is minhash(tokens) if the caller already has it.
+        """
+        best, best_score = None, self.threshold
+        for key, candidate_tokens, value in self._candidates(tokens, signature):
+            score = jaccard(tokens, candidate_tokens)
+            if score >= best_score and (accept is None or accept(key, value)):
+                best, best_score = (key, value), score
+        return best
+
+    def matches(self, tokens, accept=None, signature=None):
+        """Returns [(key, value)] of every entry find() could return for `tokens`, not just the best."""
+        return [(key, value) for key, candidate_tokens, value in self._candidates(tokens, signature)
+                if jaccard(tokens, candidate_tokens) >= self.threshold and (accept is None or accept(key, value))]
+
+    def _candidates(self, tokens, signature):
+        """Yields (key, tokens, value) of the entries sharing an LSH bucket with `tokens`, once each."""
+        signature = minhash(tokens) if signature is None else signature
+        if not signature:
+            return
+        seen = set()
+        for bucket in self._bands(signature):
+            for key in self._buckets.get(bucket, ()):
+                if key not in seen:
+                    seen.add(key)
+                    candidate_tokens, _, value = self._entries[key]
+                    yield key, candidate_tokens, value
+
+
+def cluster_headlines(headlines):
+    """
+    Groups near-duplicate `headlines` in one pass. Returns lists of indices in input order; each
+    cluster's first index is its representative (the earliest headline in the input).
+
+    Headlines that differ in what happened or where stay apart:
+
+    >>> cluster_headlines(["Man arrested for murder in Rohini", "Man arrested for robbery in Rohini"])
+    [[0], [1]]
+    >>> cluster_headlines(["Teen stabbed to death in Rohini", "Teen stabbed to death in Gurugram"])
+    [[0], [1]]
+    >>> cluster_headlines(["Delhi: Man arrested for murder in Rohini", "Man arrested for murder in Rohini"])
+    [[0, 1]]
+    """
+    index = NearDuplicateIndex()
+    clusters = []
+    for i, headline in enumerate(headlines):
+        shingles = headline_shingles(headline)
+        match = index.find(shingles)
+        if match is not None:
+            clusters[match[1]].append(i)
+        else:
+            index.add(i, shingles, len(clusters))
+            clusters.append([i])
+    return clusters
+
+
+class StoryIndex:
+    """
+    Thread-safe index of recently classified headlines, so near-duplicates (typically the other
+    source's copy of a story) reuse a classification instead of a Groq call. Only classifications
+    from the last `max_age_seconds` are reused, since a story's copies are published close together.
+    """
+
+    def __init__(self, max_entries=STORY_INDEX_MAX_ENTRIES, max_age_seconds=STORY_INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._index = NearDuplicateIndex(max_entries=max_entries)
+
+    def add(self, headline, classification):
+        with self._lock:
+            self._index.add(normalize_headline(headline), headline_shingles(headline), (dict(classification), time.time()))
+
+    def find(self, headline):
+        """Returns a copy of a recent near-duplicate's classification, or None."""
+        oldest = time.time() - self.max_age_seconds
+        with self._lock:
+            match = self._index.find(headline_shingles(headline), accept=lambda key, value: value[1] >= oldest)
+        return dict(match[1][0]) if match is not None else None
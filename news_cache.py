@@ -0,0 +1,405 @@
+import base64
+import binascii
+import bisect
+import itertools
+import json
+import random
+import threading
+import time
+from typing import NamedTuple
+
+from items import item_timestamp
+from near_duplicates import NearDuplicateIndex, headline_shingles, minhash
+
+# --- Configuration ---
+NEAR_DUPLICATE_WINDOW_SECONDS = 48 * 3600 # Copies of one story are published within this span
+
+
+class CacheSnapshot(NamedTuple):
+    """
+    An immutable view of the cache. `version` increases with every change.
+    Items are in stable time order (newest first, ties by ID, then URL); the secondary indexes hold the
+    sort keys of their items, ascending, so every filtered view keeps that order and a change
+    only touches the postings of the items it changes.
+    Near-duplicate copies of a story (same location and type, similar headline) are left out of `data`;
+    only the first reported copy is served.
+    """
+    version: int
+    data: tuple # Formatted crime items, newest first
+    updated_at: float # Epoch seconds of the last change, 0 before the first
+    sort_keys: tuple = () # (-timestamp, id, url) per item, ascending; for date ranges and cursors
+    by_location: dict = {} # casefolded location -> sort keys
+    by_type: dict = {} # casefolded crime type -> sort keys
+    by_source: dict = {} # casefolded source name -> sort keys
+    sources: tuple = () # Source name per item in `data`
+    duplicates: dict = {} # Hidden item URL -> URL of the served copy
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+_MAX_ID = "\uffff" # Sorts after every item ID and URL
+
+
+def _index_key(value):
+    return (value or "").strip().casefold()
+
+
+def _sort_key(record):
+    entry = record["entry"]
+    return (-record["ts"], entry.get("id") or "", entry["url"])
+
+
+def _same_story(record, other):
+    # Near-identical wording alone isn't enough: copies of a story agree on what and where
+    for field in ("location", "type"):
+        if _index_key(record["entry"].get(field)) != _index_key(other["entry"].get(field)):
+            return False
+    return not (record["ts"] and other["ts"]) or abs(record["ts"] - other["ts"]) <= NEAR_DUPLICATE_WINDOW_SECONDS
+
+
+def _postings(record):
+    """(index name, key) of each secondary index posting of `record`."""
+    entry = record["entry"]
+    return (("by_location", _index_key(entry.get("location"))), ("by_type", _index_key(entry.get("type"))),
+            ("by_source", _index_key(record["source"])))
+
+
+def _collapse_near_duplicates(records):
+    """
+    Returns {hidden url: served url}. The earliest copy of a story wins; copies with the same
+    timestamp go by publish order (`records` is in insertion order).
+    A record's outcome only depends on the records it matches, so collapsing each connected group
+    of matching records on its own gives the same result.
+    """
+    index = NearDuplicateIndex()
+    duplicates = {}
+    for record in sorted(records, key=lambda record: record["ts"]): # Oldest first, stable
+        match = index.find(record["shingles"], accept=lambda url, served: _same_story(record, served),
+                           signature=record["signature"])
+        if match is not None:
+            duplicates[record["entry"]["url"]] = match[0]
+        else:
+            index.add(record["entry"]["url"], record["shingles"], record, signature=record["signature"])
+    return duplicates
+
+
+def _build_snapshot(version, records, updated_at=None):
+    records = list(records)
+    duplicates = _collapse_near_duplicates(records)
+    ordered = sorted((record for record in records if record["entry"]["url"] not in duplicates), key=_sort_key)
+    indexes = {"by_location": {}, "by_type": {}, "by_source": {}}
+    for record in ordered:
+        for name, key in _postings(record):
+            indexes[name].setdefault(key, []).append(_sort_key(record))
+    freeze = lambda index: {key: tuple(keys) for key, keys in index.items()}
+    return CacheSnapshot(
+        version=version,
+        data=tuple(record["entry"] for record in ordered),
+        updated_at=time.time() if updated_at is None else updated_at,
+        sort_keys=tuple(_sort_key(record) for record in ordered),
+        by_location=freeze(indexes["by_location"]),
+        by_type=freeze(indexes["by_type"]),
+        by_source=freeze(indexes["by_source"]),
+        sources=tuple(record["source"] for record in ordered),
+        duplicates=duplicates,
+    )
+
+
+def build_snapshot(version, records, updated_at=None) -> CacheSnapshot:
+    """The snapshot that serving [(source, entry)] `records` at `version` gives, as NewsCache.replace would."""
+    return _build_snapshot(version, (NewsCache._record(entry, source) for source, entry in records), updated_at)
+
+
+def snapshot_changes(previous: CacheSnapshot, current: CacheSnapshot) -> list:
+    """
+    [(kind, source, item)] turning the served items of `previous` into those of `current`: an
+    "upsert" for every new or changed item, a "remove" ({"id", "url"} only) for every dropped one.
+    """
+    before = {entry["url"]: entry for entry in previous.data}
+    after = {entry["url"]: entry for entry in current.data}
+    changes = [("upsert", source, entry) for source, entry in zip(current.sources, current.data)
+               if before.get(entry["url"]) != entry]
+    changes += [("remove", source, {"id": entry.get("id"), "url": entry["url"]})
+                for source, entry in zip(previous.sources, previous.data) if entry["url"] not in after]
+    return changes
+
+
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(f"Malformed cursor: {cursor!r}") from e
+    if not isinstance(state, dict):
+        raise InvalidCursor(f"Malformed cursor: {cursor!r}")
+    return state
+
+
+def query_snapshot(snapshot: CacheSnapshot, location=None, crime_type=None, source=None,
+                   since=None, until=None, limit=None, cursor=None, seed=None):
+    """
+    Filters `snapshot` through its indexes without scanning the full list.
+    `since`/`until` are epoch seconds (inclusive/exclusive); items with an unknown date only match
+    without a date range. Results are in time order, or shuffled deterministically by `seed`.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    # Date range: a contiguous slice of the time-ordered positions
+    low, high = 0, len(snapshot.data)
+    if since is not None or until is not None:
+        high = bisect.bisect_left(snapshot.sort_keys, (0.0, "")) # Undated items sort last and never match a range
+    if until is not None:
+        low = bisect.bisect_right(snapshot.sort_keys, (-until, _MAX_ID, _MAX_ID))
+    if since is not None:
+        high = min(high, bisect.bisect_right(snapshot.sort_keys, (-since, _MAX_ID, _MAX_ID)))
+
+    postings = []
+    for index, value in ((snapshot.by_location, location), (snapshot.by_type, crime_type), (snapshot.by_source, source)):
+        if value is not None:
+            postings.append(index.get(_index_key(value), ()))
+    if postings:
+        postings.sort(key=len)
+        others = [frozenset(keys) for keys in postings[1:]]
+        keys = [key for key in postings[0] if all(key in other for other in others)]
+        positions = [p for p in (bisect.bisect_left(snapshot.sort_keys, key) for key in keys) if low <= p < high]
+    else:
+        positions = range(low, high)
+
+    state = decode_cursor(cursor) if cursor else {}
+    if seed is not None:
+        positions = list(positions)
+        random.Random(f"{seed}").shuffle(positions)
+        offset = state.get("o", 0)
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor(f"Cursor doesn't belong to a shuffled query: {cursor!r}")
+        page = positions[offset:offset + limit] if limit else positions[offset:]
+        more = limit is not None and offset + limit < len(positions)
+        next_cursor = encode_cursor({"o": offset + limit}) if more else None
+    else:
+        if state:
+            if not isinstance(state.get("t"), (int, float)) or not isinstance(state.get("i"), str):
+                raise InvalidCursor(f"Cursor doesn't belong to a time-ordered query: {cursor!r}")
+            # Resume after the last returned item, even if the cache changed in between
+            start = bisect.bisect_right(snapshot.sort_keys, (-state["t"], state["i"], _MAX_ID))
+            positions = positions[bisect.bisect_left(positions, start):]
+        page = positions[:limit] if limit else positions
+        more = limit is not None and len(positions) > limit
+        if more:
+            last_ts, last_id, _ = snapshot.sort_keys[page[-1]]
+            next_cursor = encode_cursor({"t": -last_ts, "i": last_id})
+        else:
+            next_cursor = None
+    return [snapshot.data[p] for p in page], next_cursor
+
+
+class NewsCache:
+    """
+    Incrementally updated store of published crime items.
+    The refresh cycle publishes items one by one as their analysis lands; every change publishes a
+    new immutable CacheSnapshot (with its secondary indexes) and bumps the version, so readers
+    calling snapshot() never see a half-applied update and never take a lock. publish() and
+    retain() derive it from the previous snapshot, touching only the changed items' positions,
+    postings and near-duplicates; load() and replace() build it from scratch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock() # Serializes writers only
+        self._items = {} # url -> {"source", "entry", "ts", "shingles", "signature", "order"}
+        self._copies = NearDuplicateIndex() # Every item by headline, to find what a change can (un)hide
+        self._order = itertools.count() # Publish order, which breaks near-duplicate timestamp ties
+        self._snapshot = CacheSnapshot(version=0, data=(), updated_at=0.0)
+        self.cycles_completed = 0
+        self._listeners = [] # callback(kind, source, item, version), run in commit order
+
+    def add_listener(self, callback):
+        """
+        Registers `callback(kind, source, item, version)` for every "upsert"/"remove" of a served
+        item (not for load()). Hiding or revealing a near-duplicate is a remove/upsert too.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, events, version):
+        for kind, source, item in events:
+            for callback in self._listeners:
+                callback(kind, source, item, version)
+        return len(events)
+
+    def snapshot(self) -> CacheSnapshot:
+        # Attribute reads are atomic, so readers always get one complete snapshot
+        return self._snapshot
+
+    def _commit(self, version=None, updated_at=None, notify=True):
+        """Publishes a new snapshot and notifies listeners of the served items that changed. Returns that count."""
+        previous = self._snapshot
+        version = previous.version + 1 if version is None else version
+        records = sorted(self._items.values(), key=lambda record: record["order"])
+        self._snapshot = _build_snapshot(version, records, updated_at)
+        return self._notify(snapshot_changes(previous, self._snapshot), version) if notify else 0
+
+    def _matching(self, record):
+        """URLs of the items `record` matches as a copy of the same story."""
+        return {url for url, _ in self._copies.matches(record["shingles"], signature=record["signature"],
+                                                       accept=lambda url, other: _same_story(record, other))}
+
+    def _connected(self, urls):
+        """`urls` plus every item linked to them through a chain of matches."""
+        connected, pending = set(), list(urls)
+        while pending:
+            url = pending.pop()
+            if url not in connected:
+                connected.add(url)
+                if url in self._items:
+                    pending.extend(self._matching(self._items[url]))
+        return connected
+
+    def _commit_changes(self, changed, linked):
+        """
+        Publishes the snapshot after the records of the `changed` URLs ({url: record before, None if
+        it is new}) were stored or dropped; `linked` are the URLs the records before matched. Only
+        the items connected to them are collapsed again, and only the served items that changed move
+        in the time order and the index postings. Listeners hear about those items only. Returns the
+        number of changes.
+        """
+        previous = self._snapshot
+        touched = self._connected(set(changed) | linked)
+        duplicates = dict(previous.duplicates)
+        for url in touched:
+            duplicates.pop(url, None)
+        members = sorted((self._items[url] for url in touched if url in self._items), key=lambda record: record["order"])
+        duplicates.update(_collapse_near_duplicates(members))
+
+        served_before, served_after = {}, {}
+        for url in touched:
+            before = changed[url] if url in changed else self._items[url]
+            if before is not None and url not in previous.duplicates:
+                served_before[url] = before
+            if url in self._items and url not in duplicates:
+                served_after[url] = self._items[url]
+        # Unchanged records are the same objects, so `is not` picks out the ones that moved
+        removed = [record for url, record in served_before.items() if served_after.get(url) is not record]
+        added = [record for url, record in served_after.items() if served_before.get(url) is not record]
+
+        data, sort_keys, sources = list(previous.data), list(previous.sort_keys), list(previous.sources)
+        indexes = {"by_location": dict(previous.by_location), "by_type": dict(previous.by_type),
+                   "by_source": dict(previous.by_source)}
+        postings = {} # (index name, key) -> sort keys, copied on first change
+
+        def posting(name, key):
+            if (name, key) not in postings:
+                postings[(name, key)] = list(indexes[name].get(key, ()))
+            return postings[(name, key)]
+
+        for record in removed:
+            sort_key = _sort_key(record)
+            position = bisect.bisect_left(sort_keys, sort_key)
+            del data[position], sort_keys[position], sources[position]
+            for name, key in _postings(record):
+                keys = posting(name, key)
+                del keys[bisect.bisect_left(keys, sort_key)]
+        for record in added:
+            sort_key = _sort_key(record)
+            position = bisect.bisect_left(sort_keys, sort_key)
+            data.insert(position, record["entry"])
+            sort_keys.insert(position, sort_key)
+            sources.insert(position, record["source"])
+            for name, key in _postings(record):
+                bisect.insort(posting(name, key), sort_key)
+        for (name, key), keys in postings.items():
+            if keys:
+                indexes[name][key] = tuple(keys)
+            else:
+                del indexes[name][key]
+
+        self._snapshot = CacheSnapshot(
+            version=previous.version + 1,
+            data=tuple(data),
+            updated_at=time.time(),
+            sort_keys=tuple(sort_keys),
+            sources=tuple(sources),
+            duplicates=duplicates,
+            **indexes,
+        )
+        events = [("upsert", record["source"], record["entry"]) for record in added
+                  if served_before.get(record["entry"]["url"], {}).get("entry") != record["entry"]]
+        events += [("remove", record["source"], {"id": record["entry"].get("id"), "url": url})
+                   for url, record in served_before.items() if url not in served_after]
+        return self._notify(events, self._snapshot.version)
+
+    @staticmethod
+    def _record(entry, source):
+        # The timestamp, headline shingles and their signature are computed once per publish, not on every rebuild
+        shingles = headline_shingles(entry.get("content"))
+        return {"source": source, "entry": entry, "ts": item_timestamp(entry), "shingles": shingles,
+                "signature": minhash(shingles)}
+
+    def _store(self, entry, source):
+        """Makes `entry` the record of its URL (keeping the publish order of the one it replaces). Returns that one or None."""
+        url = entry["url"]
+        before = self._items.get(url)
+        record = self._record(entry, source)
+        record["order"] = next(self._order) if before is None else before["order"]
+        self._items[url] = record
+        self._copies.remove(url)
+        self._copies.add(url, record["shingles"], record, signature=record["signature"])
+        return before
+
+    def _drop(self, url):
+        """Removes the record of `url`. Returns it."""
+        self._copies.remove(url)
+        return self._items.pop(url)
+
+    def load(self, records, version=None, updated_at=None):
+        """
+        Seeds the cache from persisted [(source, entry)] records, e.g. on boot. Publishes one snapshot,
+        at `version` if given (the shared snapshot's, so versions keep increasing across restarts).
+        """
+        with self._lock:
+            for source, entry in records:
+                self._store(entry, source)
+            if self._items or version:
+                self._commit(version, updated_at, notify=False)
+            return len(self._items)
+
+    def replace(self, records, version, updated_at=None):
+        """
+        Makes [(source, entry)] `records` the whole cache at `version`, e.g. the snapshot another
+        process published. Listeners get an "upsert" or "remove" for every difference.
+        """
+        with self._lock:
+            self._items, self._copies = {}, NearDuplicateIndex()
+            for source, entry in records:
+                self._store(entry, source)
+            return self._commit(version, updated_at)
+
+    def entries(self, source: str) -> list:
+        """Returns the currently published items of `source`."""
+        with self._lock:
+            return [record["entry"] for record in self._items.values() if record["source"] == source]
+
+    def publish(self, entry: dict, source: str):
+        """Adds or replaces one item (keyed by its URL) and publishes a new snapshot."""
+        with self._lock:
+            current = self._items.get(entry["url"])
+            if current is not None and current["entry"] == entry and current["source"] == source:
+                return # Unchanged: don't bump the version for nothing
+            linked = self._matching(current) if current is not None else set()
+            self._commit_changes({entry["url"]: self._store(entry, source)}, linked)
+
+    def retain(self, source: str, urls):
+        """Removes `source`'s items whose URL isn't in `urls` (they dropped off the listing or aren't crime)."""
+        urls = set(urls)
+        with self._lock:
+            stale = [url for url, record in self._items.items() if record["source"] == source and url not in urls]
+            if stale:
+                linked = set().union(*(self._matching(self._items[url]) for url in stale))
+                self._commit_changes({url: self._drop(url) for url in stale}, linked)
+            return len(stale)
+
+    def finish_cycle(self):
+        """Marks a refresh cycle complete."""
+        with self._lock:
+            self.cycles_completed += 1
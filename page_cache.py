@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import NamedTuple
+
+from metrics import LISTING_PAGES
+from store import get_news_store
+
+# --- Configuration ---
+PAGE_CACHE_VERSION = 1 # Bump whenever a parser's output changes, so stored items are re-parsed
+
+
+class CachedPage(NamedTuple):
+    """What a listing page parsed to last time, with what identifies that version of the page."""
+    fingerprint: str | None # Hash of the listing region, None if no item was found
+    etag: str | None
+    last_modified: str | None
+    items: list # Raw field dicts, as returned by the parser
+    parse_key: str | None = None # parse_key() the items were parsed under; stale items never match
+
+
+def parse_key(salt=""):
+    """Identifies how pages are parsed: PAGE_CACHE_VERSION plus `salt` (the source's parser and selectors)."""
+    return f"{PAGE_CACHE_VERSION}|{salt}"
+
+
+def listing_region(html, item_pattern):
+    """
+    The part of `html` holding the listing: from the first `item_pattern` match to one item's
+    span past the last, so headers, footers and inline scripts (timestamps, nonces, ads) around
+    the listing don't change the fingerprint. None if no item is found.
+    """
+    starts = [match.start() for match in item_pattern.finditer(html)]
+    if not starts:
+        return None
+    if len(starts) == 1:
+        return html[starts[0]:]
+    span = max(b - a for a, b in zip(starts, starts[1:]))
+    return html[starts[0]:starts[-1] + span]
+
+
+def listing_fingerprint(html, item_pattern, salt=""):
+    """Fast hash of the listing region of `html`; `salt` ties it to how the page is parsed."""
+    region = listing_region(html, item_pattern)
+    if region is None:
+        return None
+    digest = hashlib.blake2b(f"{parse_key(salt)}|".encode("utf-8"), digest_size=16)
+    digest.update(region.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class PageCache:
+    """
+    Parsed items of each listing page, keyed by URL, so a page whose listing region (or HTTP
+    validators) didn't change since the last crawl is reused instead of parsed again.
+    Persisted in the NewsStore so the cache survives restarts; counts the skip rate per source.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._counts = {} # source -> {outcome: pages}
+        self._load()
+
+    def _load(self):
+        try:
+            stored = self.store.load_pages()
+            self._pages = {url: (source, CachedPage(**state)) for url, (source, state) in stored.items()}
+            if self._pages:
+                logging.info(f"Page cache: loaded {len(self._pages)} listing pages from the store.")
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logging.warning(f"Page cache: could not load, every page is parsed again: {e}")
+
+    def get(self, url):
+        with self._lock:
+            entry = self._pages.get(url)
+        return entry[1] if entry is not None else None
+
+    def put(self, url, source, page):
+        with self._lock:
+            if self._pages.get(url) == (source, page):
+                return
+            self._pages[url] = (source, page)
+        try:
+            self.store.save_page(url, source, page._asdict())
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logging.error(f"Page cache: failed to save {url}: {e}")
+
+    def record(self, source, outcome):
+        """Counts one crawled page of `source`: "parsed", "unchanged" or "not_modified"."""
+        LISTING_PAGES.labels(source, outcome).inc()
+        with self._lock:
+            counts = self._counts.setdefault(source, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def stats(self):
+        """Returns {source: {"pages", "parsed", "unchanged", "not_modified", "skip_rate"}} since startup."""
+        with self._lock:
+            counts = {source: dict(outcomes) for source, outcomes in self._counts.items()}
+        stats = {}
+        for source, outcomes in counts.items():
+            pages = sum(outcomes.values())
+            skipped = outcomes.get("unchanged", 0) + outcomes.get("not_modified", 0)
+            stats[source] = {
+                "pages": pages,
+                "parsed": outcomes.get("parsed", 0),
+                "unchanged": outcomes.get("unchanged", 0),
+                "not_modified": outcomes.get("not_modified", 0),
+                "skip_rate": skipped / pages if pages else None,
+            }
+        return stats
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """Returns the process-wide PageCache, loading it on first use."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(get_news_store())
+        return _page_cache
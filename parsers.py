@@ -0,0 +1,212 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError: # Optional speed-up; the BeautifulSoup backends work without it
+    etree = None
+    HAS_LXML = False
+
+# --- Backend Selection ---
+# "lxml":      libxml2 parse + precompiled XPath (fastest)
+# "bs4":       BeautifulSoup restricted by SoupStrainer to the listing containers
+# "bs4-full":  the original full-page BeautifulSoup(html, "html.parser") path, kept for benchmarks
+PARSER_BACKEND = os.environ.get("PARSER_BACKEND") or ("lxml" if HAS_LXML else "bs4")
+_BS4_PARSER = "lxml" if HAS_LXML else "html.parser"
+
+# Each parser returns one dict per listing container with the raw fields the scrapers post-process:
+# {"headline": str, "link": str, "image_url": str, "date_time": str}, using "N/A" for missing values.
+
+
+def _has_class_xpath(css_class):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')"
+
+
+if HAS_LXML:
+    _HTML_PARSER = etree.HTMLParser(encoding="utf-8", remove_comments=True, no_network=True)
+    _NDTV_ITEMS = etree.XPath(f"//a[{_has_class_xpath('NwsLstPg_img')}]")
+    _NDTV_DATE = etree.XPath(f".//span[{_has_class_xpath('NwsLstPg_ovl-dt-nm')}]")
+    _NDTV_IMG = etree.XPath(f".//img[{_has_class_xpath('NwsLstPg_img-full')}]")
+    _ANI_CARDS = etree.XPath(f"//div[{_has_class_xpath('card')}]")
+    _ANI_IMG_CONTAINER = etree.XPath(f".//div[{_has_class_xpath('img-container')}]")
+    _ANY_IMG = etree.XPath(".//img")
+    _FIGCAPTION = etree.XPath(".//figcaption")
+    _ANI_TITLE = etree.XPath(f".//h6[{_has_class_xpath('title')}]")
+    _ANY_LINK = etree.XPath(".//a")
+    _ANY_LINK_WITH_HREF = etree.XPath(".//a[@href]")
+    _ANI_TIME = etree.XPath(".//p[normalize-space(@class)='time small']")
+    _ANI_TIME_RED = etree.XPath(f".//span[{_has_class_xpath('time-red')}]")
+
+
+def _lxml_root(html):
+    return etree.fromstring(html.encode("utf-8"), _HTML_PARSER)
+
+
+def _lxml_text(element):
+    """Equivalent of BeautifulSoup's get_text(strip=True)."""
+    return "".join(piece.strip() for piece in element.itertext())
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+# --- NDTV: a.NwsLstPg_img listing ---
+def _parse_ndtv_lxml(html):
+    root = _lxml_root(html)
+    if root is None:
+        return []
+    items = []
+    for item in _NDTV_ITEMS(root):
+        date_element = _first(_NDTV_DATE, item)
+        img_element = _first(_NDTV_IMG, item)
+        items.append({
+            "headline": img_element.get("title", "N/A") if img_element is not None else "N/A",
+            "link": item.get("href", "N/A"),
+            "image_url": img_element.get("src", "N/A") if img_element is not None else "N/A",
+            "date_time": _lxml_text(date_element) if date_element is not None else "N/A",
+        })
+    return items
+
+
+def _ndtv_fields_bs4(item):
+    date_element = item.find("span", class_="NwsLstPg_ovl-dt-nm")
+    img_element = item.find("img", class_="NwsLstPg_img-full")
+    return {
+        "headline": img_element.get("title", "N/A") if img_element else "N/A",
+        "link": item.get("href", "N/A"),
+        "image_url": img_element.get("src", "N/A") if img_element else "N/A",
+        "date_time": date_element.get_text(strip=True) if date_element else "N/A",
+    }
+
+
+_NDTV_STRAINER = SoupStrainer("a", class_="NwsLstPg_img")
+
+
+def _parse_ndtv_bs4(html):
+    soup = BeautifulSoup(html, _BS4_PARSER, parse_only=_NDTV_STRAINER)
+    return [_ndtv_fields_bs4(item) for item in soup.find_all("a", class_="NwsLstPg_img")]
+
+
+def _parse_ndtv_bs4_full(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [_ndtv_fields_bs4(item) for item in soup.find_all("a", class_="NwsLstPg_img")]
+
+
+# --- ANI: div.card listing ---
+def _parse_ani_lxml(html):
+    root = _lxml_root(html)
+    if root is None:
+        return []
+    cards = []
+    for card in _ANI_CARDS(root):
+        image_url = "N/A"
+        img_container = _first(_ANI_IMG_CONTAINER, card)
+        img_element = _first(_ANY_IMG, img_container if img_container is not None else card)
+        if img_element is not None:
+            image_url = img_element.get("src", "N/A")
+
+        headline = "N/A"
+        link = "N/A"
+        date_time = "N/A"
+        figcaption = _first(_FIGCAPTION, card)
+        if figcaption is not None:
+            title_element = _first(_ANI_TITLE, figcaption)
+            headline = _lxml_text(title_element) if title_element is not None else "N/A"
+            link_element = _first(_ANY_LINK, figcaption)
+            if link_element is not None and link_element.get("href") is not None:
+                link = link_element.get("href")
+            time_element = _first(_ANI_TIME, figcaption)
+            time_red = _first(_ANI_TIME_RED, time_element) if time_element is not None else None
+            if time_red is not None:
+                date_time = _lxml_text(time_red).replace("IST", "").strip()
+        else:
+            # Fallback: link (and its text as headline) directly in the card
+            link_element = _first(_ANY_LINK_WITH_HREF, card)
+            if link_element is not None:
+                link = link_element.get("href")
+                headline = _lxml_text(link_element) or headline
+        cards.append({"headline": headline, "link": link, "image_url": image_url, "date_time": date_time})
+    return cards
+
+
+def _ani_fields_bs4(card):
+    image_url = "N/A"
+    img_container = card.find("div", class_="img-container")
+    img_element = (img_container or card).find("img")
+    if img_element:
+        image_url = img_element.get("src", "N/A")
+
+    headline = "N/A"
+    link = "N/A"
+    date_time = "N/A"
+    figcaption = card.find("figcaption")
+    if figcaption:
+        title_element = figcaption.find("h6", class_="title")
+        headline = title_element.get_text(strip=True) if title_element else "N/A"
+        link_element = figcaption.find("a")
+        if link_element and link_element.has_attr("href"):
+            link = link_element["href"]
+        time_element = figcaption.find("p", class_="time small")
+        time_red = time_element.find("span", class_="time-red") if time_element else None
+        if time_red:
+            date_time = time_red.get_text(strip=True).replace("IST", "").strip()
+    else:
+        # Fallback: link (and its text as headline) directly in the card
+        link_element = card.find("a", href=True)
+        if link_element:
+            link = link_element["href"]
+            headline = link_element.get_text(strip=True) or headline
+    return {"headline": headline, "link": link, "image_url": image_url, "date_time": date_time}
+
+
+_ANI_STRAINER = SoupStrainer("div", class_="card")
+
+
+def _parse_ani_bs4(html):
+    soup = BeautifulSoup(html, _BS4_PARSER, parse_only=_ANI_STRAINER)
+    return [_ani_fields_bs4(card) for card in soup.find_all("div", class_="card")]
+
+
+def _parse_ani_bs4_full(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [_ani_fields_bs4(card) for card in soup.find_all("div", class_="card")]
+
+
+# --- Declarative: any listing described by CSS selectors (sources.SourceSpec.fields) ---
+def _select_field(item, spec):
+    selector, _, attribute = spec.partition("@")
+    element = item.select_one(selector) if selector else item
+    if element is None:
+        return "N/A"
+    if attribute:
+        value = element.get(attribute)
+        return value if value is not None else "N/A"
+    return element.get_text(strip=True) or "N/A"
+
+
+def parse_with_selectors(html, item_selector, fields):
+    """
+    Parses a listing with CSS selectors: one dict per `item_selector` match, with each of `fields`
+    ({"headline": "h2 a", "link": "h2 a@href", ...}) read inside it; "N/A" where missing.
+    """
+    soup = BeautifulSoup(html, _BS4_PARSER)
+    return [{field: _select_field(item, spec) for field, spec in fields.items()} for item in soup.select(item_selector)]
+
+
+_PARSERS = {
+    "ndtv": {"lxml": _parse_ndtv_lxml, "bs4": _parse_ndtv_bs4, "bs4-full": _parse_ndtv_bs4_full},
+    "ani": {"lxml": _parse_ani_lxml, "bs4": _parse_ani_bs4, "bs4-full": _parse_ani_bs4_full},
+}
+
+
+def available_backends():
+    return [backend for backend in ("lxml", "bs4", "bs4-full") if backend != "lxml" or HAS_LXML]
+
+
+def parse_listing(source, html, backend=None):
+    """Parses a listing page of `source` ("ndtv" or "ani") into raw field dicts with the chosen backend."""
+    return _PARSERS[source][backend or PARSER_BACKEND](html)
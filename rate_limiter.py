@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` units and refills `capacity` per `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period # units per second
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float, rate_scale: float = 1.0):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.level = min(self.capacity, self.level + elapsed * self.rate * rate_scale)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, rate_scale: float = 1.0) -> float:
+        """Seconds until `amount` units are available (0 if available now). Call after refill()."""
+        # Requests bigger than the whole bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.rate * rate_scale)
+
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter for Groq calls.
+    Callers block in acquire() until both budgets allow the request. On a 429 the
+    limiter pauses everyone for the server's Retry-After and lowers its effective
+    rate; successful calls slowly restore it (AIMD).
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int,
+                 min_rate_scale: float = 0.25, recovery_step: float = 0.05):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.min_rate_scale = min_rate_scale
+        self.recovery_step = recovery_step
+        self.rate_scale = 1.0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, estimated_tokens: int):
+        """Blocks until one request and `estimated_tokens` tokens fit in the budget, then spends them."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now, self.rate_scale)
+                self.tokens.refill(now, self.rate_scale)
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, self.rate_scale),
+                    self.tokens.wait_time(estimated_tokens, self.rate_scale),
+                )
+                if wait <= 0:
+                    self.requests.level -= 1
+                    self.tokens.level -= min(estimated_tokens, self.tokens.capacity)
+                    return
+                self._cond.wait(timeout=wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token budget once the real usage of a request is known."""
+        with self._cond:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - actual_tokens)
+            if self.rate_scale < 1.0:
+                self.rate_scale = min(1.0, self.rate_scale + self.recovery_step)
+            self._cond.notify_all()
+
+    def backoff(self, retry_after: float):
+        """Pauses all callers for `retry_after` seconds and halves the effective rate."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self.rate_scale = max(self.min_rate_scale, self.rate_scale / 2)
+            # The server says we're over budget, so don't trust the buckets' saved-up capacity
+            self.requests.level = min(self.requests.level, 0.0)
+            self.tokens.level = min(self.tokens.level, 0.0)
+            logging.warning(f"Rate limiter: backing off {retry_after:.1f}s, rate scaled to {self.rate_scale:.2f}.")
+            self._cond.notify_all()
@@ -0,0 +1,36 @@
+"""
+Standalone refresher: scrapes, analyzes and publishes into the shared store, serving no HTTP.
+Run exactly one next to API workers that only follow the store, e.g.:
+
+    python refresher.py &
+    REFRESH_MODE=follower uvicorn app:app --host 0.0.0.0 --port 8000 --workers 4
+
+A second refresher (or an "auto" worker) waits on the refresher lock and takes over if this one exits.
+
+This process serves no /metrics of its own. To see its scraper, Groq and scheduler metrics, start
+every process with the same, empty PROMETHEUS_MULTIPROC_DIR; /metrics on any API worker then
+reports all of them:
+
+    rm -rf /tmp/sentinal-metrics && mkdir /tmp/sentinal-metrics
+    export PROMETHEUS_MULTIPROC_DIR=/tmp/sentinal-metrics
+    python refresher.py &
+    REFRESH_MODE=follower uvicorn app:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import logging
+import os
+
+os.environ["REFRESH_MODE"] = "off" # This process refreshes in the foreground, not in app's background thread
+
+import app  # noqa: E402
+
+
+def main():
+    logging.info(f"Refresher: waiting for the refresher lock ({app.REFRESHER_LOCK_PATH})...")
+    app.refresher_lock.acquire(blocking=True)
+    app.sync_shared_cache() # Continue from the last published version
+    logging.info(f"Refresher: lock acquired (pid {os.getpid()}), starting the refresh loop.")
+    app.update_news_cache()
+
+
+if __name__ == "__main__":
+    main()
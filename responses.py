@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import json
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError: # Optional; clients then get gzip
+    brotli = None
+    HAS_BROTLI = False
+
+# --- Compression Configuration ---
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9 # Encoded once per cache version, so a high quality is affordable
+MIN_COMPRESS_BYTES = 512 # Smaller bodies aren't worth the encoding overhead
+
+
+class EncodedResponse:
+    """One cache version's {"data": [...]} body, pre-encoded as JSON and compressed variants, with its validators."""
+
+    def __init__(self, version, data, updated_at):
+        self.version = version
+        # Same encoding as FastAPI's JSONResponse
+        self.body = json.dumps({"data": list(data)}, ensure_ascii=False, allow_nan=False,
+                               indent=None, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.last_modified = formatdate(updated_at, usegmt=True)
+        self.updated_at = int(updated_at)
+        self.encoded = {"identity": self.body}
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            self.encoded["gzip"] = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            if HAS_BROTLI:
+                self.encoded["br"] = brotli.compress(self.body, quality=BROTLI_QUALITY)
+
+    def etag_for(self, encoding):
+        # Strong validators are per representation, so compressed variants get their own tag
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+    def negotiate(self, accept_encoding):
+        """Picks the best available encoding for an Accept-Encoding header."""
+        accepted = set()
+        for part in (accept_encoding or "").lower().split(","):
+            name, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name.strip())
+        for encoding in ("br", "gzip"):
+            if encoding in self.encoded and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def not_modified(self, if_none_match, if_modified_since):
+        """
+        True if the request's validators match this version (If-None-Match takes precedence).
+        Last-Modified has one-second precision and several versions can be published within a
+        second, so If-Modified-Since only matches a date strictly after this version's second; a
+        client holding an earlier same-second version always gets the body. The ETag is exact.
+        """
+        if if_none_match:
+            if if_none_match.strip() == "*":
+                return True
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag.startswith("W/"):
+                    tag = tag[2:]
+                # Weak comparison: any encoding of the same body matches
+                if tag == self.etag or any(tag == self.etag_for(encoding) for encoding in self.encoded):
+                    return True
+            return False
+        if if_modified_since:
+            try:
+                return int(parsedate_to_datetime(if_modified_since).timestamp()) > self.updated_at
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class ResponseCache:
+    """Holds the EncodedResponse of the latest cache version; each version is encoded at most once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+
+    def get(self, snapshot):
+        """Returns the encoded response for `snapshot`, or for a newer version if one was already encoded."""
+        current = self._current
+        if current is not None and current.version >= snapshot.version:
+            return current
+        with self._lock:
+            # Another request may have encoded this version while we waited
+            if self._current is None or self._current.version < snapshot.version:
+                self._current = EncodedResponse(snapshot.version, snapshot.data, snapshot.updated_at)
+            return self._current
@@ -0,0 +1,181 @@
+import logging
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from metrics import SOURCE_NEXT_RUN_TIMESTAMP, SOURCE_REFRESH_INTERVAL_SECONDS, SOURCE_TICKS_SKIPPED
+
+# --- Configuration ---
+BASE_REFRESH_INTERVAL_SECONDS = 920 # Until a source's publication rate is known
+MIN_REFRESH_INTERVAL_SECONDS = 180
+MAX_REFRESH_INTERVAL_SECONDS = 3600
+TARGET_NEW_ITEMS_PER_RUN = 3 # Poll about as often as this many new items appear
+RATE_SMOOTHING = 0.3 # EWMA weight of the newest publication-rate sample
+JITTER_FRACTION = 0.1 # +/- share of the interval, so sources and restarts don't poll in lockstep
+SOURCE_TIMEZONE = timezone(timedelta(hours=5, minutes=30)) # The sites' (IST) news day
+# Interval scale by hour of the news day: faster at peak hours, slower overnight (other hours: 1.0)
+HOUR_FACTORS = {**{hour: 2.0 for hour in range(0, 6)}, **{hour: 0.6 for hour in range(9, 21)}}
+
+
+class SourceSchedule:
+    """Refresh state of one source: its estimated publication rate and when it runs next."""
+
+    def __init__(self, rate=None, interval=BASE_REFRESH_INTERVAL_SECONDS, next_run=0.0, last_started=0.0,
+                 last_finished=0.0, observed_at=0.0, last_new_items=None, skipped_ticks=0, in_flight=False):
+        self.rate = rate # New items per second (EWMA), None until observed
+        self.interval = interval
+        self.next_run = next_run
+        self.last_started = last_started
+        self.last_finished = last_finished
+        self.observed_at = observed_at # When `rate` last got a sample
+        self.last_new_items = last_new_items
+        self.skipped_ticks = skipped_ticks
+        self.in_flight = in_flight
+
+    def to_dict(self):
+        return {
+            "rate": self.rate,
+            "interval": self.interval,
+            "next_run": self.next_run,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "observed_at": self.observed_at,
+            "last_new_items": self.last_new_items,
+            "skipped_ticks": self.skipped_ticks,
+            "in_flight": self.in_flight,
+        }
+
+
+class RefreshScheduler:
+    """
+    Per-source refresh schedule. Each source's interval targets TARGET_NEW_ITEMS_PER_RUN new items
+    per run from its observed publication rate, scaled by HOUR_FACTORS and clamped to the source's
+    bounds, with jitter. Runs are scheduled from their start time (fixed rate, no drift); a tick
+    that comes due while the previous run is still in flight is skipped.
+    The state is persisted to `store` so it survives restarts and other processes can read it.
+    """
+
+    def __init__(self, sources, store=None, min_intervals=None, max_intervals=None, rng=None, metric_labels=None):
+        self.store = store
+        self.metric_labels = metric_labels or {} # source -> its `source` label in metrics (default: the name)
+        self.min_intervals = min_intervals or {}
+        self.max_intervals = max_intervals or {}
+        self._random = rng or random.Random()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._schedules = {source: SourceSchedule() for source in sources}
+        self._load()
+
+    def _load(self):
+        if self.store is None:
+            return
+        try:
+            stored = self.store.load_schedule()
+        except sqlite3.Error as e:
+            logging.warning(f"Scheduler: could not load the stored schedule, every source starts fresh: {e}")
+            return
+        for source, state in stored.items():
+            if source in self._schedules:
+                state = dict(state, in_flight=False) # Whatever ran before the restart is gone
+                self._schedules[source] = SourceSchedule(**state)
+
+    def _save(self):
+        if self.store is None:
+            return
+        try:
+            self.store.save_schedule(self.status())
+        except sqlite3.Error as e:
+            logging.error(f"Scheduler: failed to save the schedule: {e}")
+
+    def _interval(self, source, schedule, at):
+        if schedule.rate is None:
+            interval = BASE_REFRESH_INTERVAL_SECONDS
+        elif schedule.rate <= 0:
+            interval = float("inf")
+        else:
+            interval = TARGET_NEW_ITEMS_PER_RUN / schedule.rate
+        interval *= HOUR_FACTORS.get(datetime.fromtimestamp(at, SOURCE_TIMEZONE).hour, 1.0)
+        interval = min(max(interval, self.min_intervals.get(source, MIN_REFRESH_INTERVAL_SECONDS)),
+                       self.max_intervals.get(source, MAX_REFRESH_INTERVAL_SECONDS))
+        return interval * (1 + self._random.uniform(-JITTER_FRACTION, JITTER_FRACTION))
+
+    def _publish(self, source, schedule):
+        label = self.metric_labels.get(source, source)
+        SOURCE_NEXT_RUN_TIMESTAMP.labels(label).set(schedule.next_run)
+        SOURCE_REFRESH_INTERVAL_SECONDS.labels(label).set(schedule.interval)
+
+    def try_start(self, source, now=None):
+        """Marks `source` as running; returns False if its previous run is still in flight."""
+        now = time.time() if now is None else now
+        with self._lock:
+            schedule = self._schedules[source]
+            if schedule.in_flight:
+                return False
+            schedule.in_flight = True
+            schedule.last_started = now
+            schedule.interval = self._interval(source, schedule, now)
+            schedule.next_run = now + schedule.interval
+            self._publish(source, schedule)
+        self._save()
+        return True
+
+    def due(self, now=None):
+        """Starts and returns the sources whose next run has come; in-flight ones skip the tick."""
+        now = time.time() if now is None else now
+        started, skipped = [], []
+        with self._lock:
+            for source, schedule in self._schedules.items():
+                if schedule.next_run > now:
+                    continue
+                if schedule.in_flight:
+                    schedule.skipped_ticks += 1
+                    schedule.next_run = now + schedule.interval
+                    SOURCE_TICKS_SKIPPED.labels(self.metric_labels.get(source, source)).inc()
+                    self._publish(source, schedule)
+                    skipped.append(source)
+                    continue
+                started.append(source)
+        for source in skipped:
+            logging.warning(f"Scheduler: {source} is still running from its last tick; skipping this one.")
+        return [source for source in started if self.try_start(source, now)]
+
+    def observe(self, source, new_items, now=None):
+        """Records that a run of `source` found `new_items` items it hadn't listed before."""
+        now = time.time() if now is None else now
+        with self._lock:
+            schedule = self._schedules[source]
+            if schedule.observed_at:
+                sample = new_items / max(now - schedule.observed_at, 1.0)
+                schedule.rate = sample if schedule.rate is None else \
+                    RATE_SMOOTHING * sample + (1 - RATE_SMOOTHING) * schedule.rate
+            schedule.observed_at = now
+            schedule.last_new_items = new_items
+
+    def finish(self, source, now=None):
+        """Ends `source`'s run and schedules the next one from the run's start, with the updated rate."""
+        now = time.time() if now is None else now
+        with self._changed:
+            schedule = self._schedules[source]
+            schedule.in_flight = False
+            schedule.last_finished = now
+            schedule.interval = self._interval(source, schedule, schedule.last_started)
+            schedule.next_run = max(now, schedule.last_started + schedule.interval)
+            self._publish(source, schedule)
+            self._changed.notify_all()
+        logging.info(f"Scheduler: next {source} run in {schedule.next_run - now:.0f}s "
+                     f"(interval {schedule.interval:.0f}s, rate {(schedule.rate or 0) * 3600:.1f} new items/h).")
+        self._save()
+
+    def wait_for_next_run(self, max_seconds=60.0):
+        """Sleeps until the earliest next run (at most `max_seconds`), waking early when a run finishes."""
+        with self._changed:
+            next_run = min((schedule.next_run for schedule in self._schedules.values() if not schedule.in_flight),
+                           default=time.time() + max_seconds)
+            self._changed.wait(min(max(0.0, next_run - time.time()), max_seconds))
+
+    def status(self):
+        """Returns {source: SourceSchedule.to_dict()}."""
+        with self._lock:
+            return {source: schedule.to_dict() for source, schedule in self._schedules.items()}
@@ -0,0 +1,113 @@
+import re
+import string
+from typing import NamedTuple
+
+
+class SourceSpec(NamedTuple):
+    """
+    Declaration of one news site for the crawl engine (crawler.py).
+    `fields` maps each raw field ("headline", "link", "image_url", "date_time") to a CSS selector
+    inside one listing item, with "@attribute" to read an attribute instead of the text; "" means
+    the item element itself. Dates are split by `date_pattern` (named groups, matched against the
+    whitespace-collapsed raw text) into `date_template` and `time_template` (str.format, with
+    "!l" to lowercase a group); text that doesn't match is kept as the date, with time "N/A".
+    """
+    key: str # Short ID for metrics, watermarks and browser allowlists
+    name: str # Display name, stored with the items
+    url_template: str # Listing URL; "{page}" is the page number for the "paginate" strategy
+    strategy: str # "scroll": one infinite-scroll page in a browser; "paginate": numbered pages over HTTP (browser fallback)
+    item_selector: str # CSS selector of one listing item: browser waits, scrolling and the server-render check
+    fields: dict
+    date_pattern: str
+    date_template: str
+    time_template: str = ""
+    parser: str | None = None # Tuned parser in parsers.py for this markup; None parses with `fields`
+    pages: int = 1 # "paginate": pages per full crawl
+    page_concurrency: int = 3 # "paginate": pages fetched at once (fetcher.DOMAIN_CONCURRENCY still caps the domain)
+    load_timeout_seconds: float = 10 # Max wait for the first items in a browser
+    max_scrolls: int = 10 # "scroll": scrolls per crawl ("paginate" browser fallback: 1)
+    scroll_settle_seconds: float = 2.5 # Max wait for new items after each scroll
+    scroll_budget_seconds: float = 25
+    scrape_timeout_seconds: float = 180 # The whole crawl; abandoned for the cycle beyond this
+    min_refresh_interval_seconds: float | None = None # Floor for the adaptive scheduler
+
+
+# --- Registry ---
+SOURCES = [
+    SourceSpec(
+        key="ndtv",
+        name="NDTV",
+        url_template="https://www.ndtv.com/delhi-news#pfrom=home-ndtv_mainnavigation",
+        strategy="scroll",
+        item_selector="a.NwsLstPg_img",
+        fields={
+            "headline": "img.NwsLstPg_img-full@title",
+            "link": "@href",
+            "image_url": "img.NwsLstPg_img-full@src",
+            "date_time": "span.NwsLstPg_ovl-dt-nm",
+        },
+        # "Mar 18, 2025 | 12:45pm IST" -> "Mar18,2025", "12:45pm"
+        date_pattern=r"^(?P<month>\S{1,3})\S*\s+(?P<day>[^\s,]*),*\s+(?P<year>[^\s,]*),*\s+\S+\s+(?P<time>\S+)",
+        date_template="{month}{day},{year}",
+        time_template="{time!l}",
+        parser="ndtv",
+        load_timeout_seconds=10,
+        max_scrolls=10,
+        scroll_settle_seconds=2.5,
+        scroll_budget_seconds=25,
+        scrape_timeout_seconds=180,
+        min_refresh_interval_seconds=300, # Needs a browser
+    ),
+    SourceSpec(
+        key="ani",
+        name="ANI News",
+        url_template="https://www.aninews.in/topic/delhi/page/{page}/",
+        strategy="paginate",
+        item_selector="div.card",
+        fields={
+            "headline": "figcaption h6.title",
+            "link": "figcaption a@href",
+            "image_url": "div.img-container img@src",
+            "date_time": "figcaption p.time.small span.time-red",
+        },
+        # "Jun 10, 2024 15:30 IST" -> "Jun 10, 2024", "15:30"
+        date_pattern=r"^(?P<date>\S+ \S+ \S+)(?: (?P<time>.+?))??(?: IST)?$",
+        date_template="{date}",
+        time_template="{time}",
+        parser="ani",
+        pages=7,
+        page_concurrency=3,
+        load_timeout_seconds=8,
+        scroll_settle_seconds=2,
+        scrape_timeout_seconds=150,
+    ),
+]
+
+
+class _TemplateFormatter(string.Formatter):
+    def convert_field(self, value, conversion):
+        if conversion == "l":
+            return str(value).lower()
+        return super().convert_field(value, conversion)
+
+
+_formatter = _TemplateFormatter()
+_date_patterns = {}
+
+
+def format_item_datetime(spec, raw):
+    """Splits a raw listing date text into the item's ("date", "time") strings per `spec`."""
+    if not raw or raw == "N/A":
+        return "N/A", "N/A"
+    text = " ".join(raw.split())
+    pattern = _date_patterns.get(spec.date_pattern)
+    if pattern is None:
+        pattern = _date_patterns[spec.date_pattern] = re.compile(spec.date_pattern)
+    match = pattern.match(text)
+    if match is None:
+        return text, "N/A"
+    groups = match.groupdict()
+    date = _formatter.format(spec.date_template, **groups)
+    if not spec.time_template or any(groups.get(name) is None for _, name, _, _ in _formatter.parse(spec.time_template) if name):
+        return date, "N/A"
+    return date, _formatter.format(spec.time_template, **groups)
@@ -0,0 +1,329 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from items import item_timestamp
+
+# --- Configuration ---
+STORE_PATH = os.environ.get("STORE_PATH", "sentinal.db")
+ITEM_RETENTION_SECONDS = 14 * 24 * 3600 # Items not seen in a listing for this long are pruned
+BUSY_TIMEOUT_MS = 5000
+CHANGE_LOG_SIZE = 2000 # Most recent change events kept, so any worker can resume a feed cursor
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    url TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    id TEXT,
+    content TEXT,
+    date TEXT,
+    time TEXT,
+    image_url TEXT,
+    read_more_url TEXT,
+    published_ts REAL NOT NULL DEFAULT 0, -- Parsed date/time, 0 if unknown
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    is_published INTEGER NOT NULL DEFAULT 0, -- Currently served as a crime item
+    crime_type TEXT,
+    location TEXT
+);
+CREATE INDEX IF NOT EXISTS items_published_ts ON items(published_ts);
+CREATE INDEX IF NOT EXISTS items_location ON items(location);
+CREATE INDEX IF NOT EXISTS items_source_published ON items(source, is_published);
+CREATE INDEX IF NOT EXISTS items_last_seen ON items(last_seen);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    result TEXT NOT NULL, -- JSON
+    stored_at REAL NOT NULL,
+    position INTEGER NOT NULL -- LRU order, oldest used first
+);
+
+CREATE TABLE IF NOT EXISTS cache_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1), -- Single row
+    version INTEGER NOT NULL, -- Shared snapshot version; the refresher advances it with every commit
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, -- Change feed cursor, the same on every worker
+    version INTEGER NOT NULL, -- cache_state version the change was published with
+    kind TEXT NOT NULL, -- "upsert" or "remove"
+    source TEXT NOT NULL,
+    item TEXT NOT NULL, -- JSON of the formatted item ({"id", "url"} for removals)
+    at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS schedule (
+    source TEXT PRIMARY KEY,
+    state TEXT NOT NULL, -- JSON of SourceSchedule.to_dict()
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    source TEXT PRIMARY KEY,
+    state TEXT NOT NULL, -- JSON of SourceWatermark.to_dict()
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY, -- Listing page
+    source TEXT NOT NULL,
+    state TEXT NOT NULL, -- JSON of page_cache.CachedPage
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class NewsStore:
+    """
+    SQLite store for scraped items, published crime items, analysis results, source watermarks,
+    the refresh schedule, the parsed listing pages and the change log of the shared snapshot.
+    Runs in WAL mode so the background refresher's writes never block API readers. Each thread
+    gets its own connection; writes are serialized by a process-wide lock. The published items
+    plus `cache_state` form the shared snapshot that API workers in other processes follow;
+    `changes` holds the served-item changes between its versions, in one sequence for every worker.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._write_lock:
+            self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; a crash loses at most the last cycle
+            connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.connection = connection
+        return connection
+
+    def _write(self, statements):
+        """Runs `statements(connection)` in one IMMEDIATE transaction."""
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                statements(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    # --- Items ---
+    def upsert_items(self, source, raw_items):
+        """Records a source's scraped listing; existing rows keep their first_seen and published state."""
+        now = time.time()
+        rows = [
+            (item["url"], source, item.get("id"), item.get("content"), item.get("date"), item.get("time"),
+             item.get("imageUrl"), item.get("readMoreUrl"), item_timestamp(item), now, now)
+            for item in raw_items if item.get("url")
+        ]
+        self._write(lambda connection: connection.executemany(
+            """
+            INSERT INTO items (url, source, id, content, date, time, image_url, read_more_url, published_ts, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                source = excluded.source, id = excluded.id, content = excluded.content, date = excluded.date,
+                time = excluded.time, image_url = excluded.image_url, read_more_url = excluded.read_more_url,
+                published_ts = excluded.published_ts, last_seen = excluded.last_seen
+            """,
+            rows,
+        ))
+
+    def set_published(self, source, entries, version=None, changes=()):
+        """
+        Makes `entries` (formatted crime items) the source's published set. With a `version` (the
+        next shared snapshot version) the shared snapshot's version advances in the same transaction,
+        and `changes` ([(kind, source, item)] it makes to the served items) are appended to the change
+        log. Returns the logged changes as (seq, kind, source, item, version, at).
+        """
+        now = time.time()
+        rows = [
+            (entry["url"], source, entry.get("id"), entry.get("content"), entry.get("date"), entry.get("time"),
+             entry.get("imageUrl"), entry.get("readMoreUrl"), item_timestamp(entry), now, now,
+             entry.get("type"), entry.get("location"))
+            for entry in entries if entry.get("url")
+        ]
+        logged = []
+
+        def statements(connection):
+            connection.execute("UPDATE items SET is_published = 0 WHERE source = ? AND is_published = 1", (source,))
+            connection.executemany(
+                """
+                INSERT INTO items (url, source, id, content, date, time, image_url, read_more_url, published_ts,
+                                   first_seen, last_seen, is_published, crime_type, location)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    source = excluded.source, id = excluded.id, content = excluded.content, date = excluded.date,
+                    time = excluded.time, image_url = excluded.image_url, read_more_url = excluded.read_more_url,
+                    published_ts = excluded.published_ts, is_published = 1,
+                    crime_type = excluded.crime_type, location = excluded.location
+                """,
+                rows,
+            )
+            if version is not None:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache_state (id, version, updated_at) VALUES (1, ?, ?)", (version, now)
+                )
+                for kind, change_source, item in changes:
+                    seq = connection.execute(
+                        "INSERT INTO changes (version, kind, source, item, at) VALUES (?, ?, ?, ?, ?)",
+                        (version, kind, change_source, json.dumps(item, ensure_ascii=False), now),
+                    ).lastrowid
+                    logged.append((seq, kind, change_source, item, version, now))
+                if logged:
+                    connection.execute("DELETE FROM changes WHERE seq <= ?", (logged[-1][0] - CHANGE_LOG_SIZE,))
+        self._write(statements)
+        return logged
+
+    @staticmethod
+    def _raw_item(row):
+        return {
+            "content": row["content"],
+            "date": row["date"],
+            "id": row["id"],
+            "imageUrl": row["image_url"],
+            "readMoreUrl": row["read_more_url"],
+            "time": row["time"],
+            "url": row["url"],
+        }
+
+    def load_published(self):
+        """Returns [(source, entry)] of the published crime items, newest first."""
+        rows = self._connection().execute(
+            "SELECT * FROM items WHERE is_published = 1 ORDER BY published_ts DESC, first_seen DESC"
+        ).fetchall()
+        return [
+            (row["source"], dict(self._raw_item(row), type=row["crime_type"], location=row["location"]))
+            for row in rows
+        ]
+
+    def load_cache_state(self):
+        """Returns (version, updated_at) of the shared snapshot, (0, 0.0) if none was published yet."""
+        row = self._connection().execute("SELECT version, updated_at FROM cache_state WHERE id = 1").fetchone()
+        return (row["version"], row["updated_at"]) if row else (0, 0.0)
+
+    def load_shared_snapshot(self):
+        """Returns (version, updated_at, [(source, entry)]) read in one transaction, so they match."""
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            version, updated_at = self.load_cache_state()
+            records = self.load_published()
+        finally:
+            connection.execute("COMMIT")
+        return version, updated_at, records
+
+    def load_changes(self, after_seq, max_version, limit=CHANGE_LOG_SIZE):
+        """
+        Returns the last `limit` logged changes after `after_seq` published at or before `max_version`,
+        oldest first, as (seq, kind, source, item, version, at).
+        """
+        rows = self._connection().execute(
+            "SELECT * FROM changes WHERE seq > ? AND version <= ? ORDER BY seq DESC LIMIT ?",
+            (after_seq, max_version, limit),
+        ).fetchall()
+        return [(row["seq"], row["kind"], row["source"], json.loads(row["item"]), row["version"], row["at"])
+                for row in reversed(rows)]
+
+    def load_latest_listing(self, source):
+        """Returns the raw items of the source's most recently stored listing."""
+        rows = self._connection().execute(
+            "SELECT * FROM items WHERE source = ? AND last_seen = (SELECT MAX(last_seen) FROM items WHERE source = ?)",
+            (source, source),
+        ).fetchall()
+        return [self._raw_item(row) for row in rows]
+
+    def prune(self, retention_seconds=ITEM_RETENTION_SECONDS):
+        """Deletes items no listing has contained for `retention_seconds`. Returns the number deleted."""
+        cutoff = time.time() - retention_seconds
+        deleted = []
+        self._write(lambda connection: deleted.append(
+            connection.execute("DELETE FROM items WHERE last_seen < ?", (cutoff,)).rowcount
+        ))
+        return deleted[0]
+
+    # --- Analyses ---
+    def load_analyses(self, namespace):
+        """Returns [(key, {"result": dict, "stored_at": float})] for `namespace`, oldest used first."""
+        rows = self._connection().execute(
+            "SELECT key, result, stored_at FROM analyses WHERE namespace = ? ORDER BY position", (namespace,)
+        ).fetchall()
+        return [(row["key"], {"result": json.loads(row["result"]), "stored_at": row["stored_at"]}) for row in rows]
+
+    def replace_analyses(self, namespace, entries):
+        """Replaces all stored analyses with `entries` ([(key, entry)], oldest used first)."""
+        rows = [(key, namespace, json.dumps(entry["result"]), entry["stored_at"], position)
+                for position, (key, entry) in enumerate(entries)]
+
+        def statements(connection):
+            # Entries of other namespaces (older model/prompt versions) can never be hit again
+            connection.execute("DELETE FROM analyses")
+            connection.executemany(
+                "INSERT INTO analyses (key, namespace, result, stored_at, position) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        self._write(statements)
+
+    # --- Watermarks ---
+    def load_watermarks(self):
+        """Returns {source: SourceWatermark.to_dict()}."""
+        rows = self._connection().execute("SELECT source, state FROM watermarks").fetchall()
+        return {row["source"]: json.loads(row["state"]) for row in rows}
+
+    def save_watermarks(self, states):
+        now = time.time()
+        rows = [(source, json.dumps(state), now) for source, state in states.items()]
+        self._write(lambda connection: connection.executemany(
+            "INSERT OR REPLACE INTO watermarks (source, state, updated_at) VALUES (?, ?, ?)", rows
+        ))
+
+    # --- Schedule ---
+    def load_schedule(self):
+        """Returns {source: SourceSchedule.to_dict()}."""
+        rows = self._connection().execute("SELECT source, state FROM schedule").fetchall()
+        return {row["source"]: json.loads(row["state"]) for row in rows}
+
+    def save_schedule(self, states):
+        now = time.time()
+        rows = [(source, json.dumps(state), now) for source, state in states.items()]
+        self._write(lambda connection: connection.executemany(
+            "INSERT OR REPLACE INTO schedule (source, state, updated_at) VALUES (?, ?, ?)", rows
+        ))
+
+    # --- Listing pages ---
+    def load_pages(self):
+        """Returns {url: (source, page_cache.CachedPage as a dict)}."""
+        rows = self._connection().execute("SELECT url, source, state FROM pages").fetchall()
+        return {row["url"]: (row["source"], json.loads(row["state"])) for row in rows}
+
+    def save_page(self, url, source, state):
+        self._write(lambda connection: connection.execute(
+            "INSERT OR REPLACE INTO pages (url, source, state, updated_at) VALUES (?, ?, ?, ?)",
+            (url, source, json.dumps(state), time.time()),
+        ))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_news_store():
+    """Returns the process-wide NewsStore, creating the database on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NewsStore()
+            logging.info(f"News store: using {os.path.abspath(_store.path)} (WAL mode).")
+        return _store
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from store import get_news_store
+
+# --- Configuration ---
+WATERMARKS_PATH = os.environ.get("WATERMARKS_PATH", "watermarks.json") # Legacy JSON file, imported once into the store
+FULL_CRAWL_INTERVAL_SECONDS = 3 * 3600 # Incremental cycles in between; a full-depth crawl at least this often
+MAX_SEEN_URLS = 2000 # Per source
+
+
+class SourceWatermark:
+    """
+    High-water mark of one source: the URLs seen so far (with first-seen times), the last
+    full listing it produced, and when the last full-depth crawl ran.
+    """
+
+    def __init__(self, seen=None, items=None, last_full_crawl=0.0):
+        self.seen = dict(seen or {}) # url -> first seen (epoch seconds), oldest first
+        self.items = list(items or []) # Raw entries of the current listing, newest first
+        self.last_full_crawl = last_full_crawl
+
+    def needs_full_crawl(self, now=None):
+        """True on cold start or once FULL_CRAWL_INTERVAL_SECONDS passed since the last full crawl."""
+        now = time.time() if now is None else now
+        return not self.seen or now - self.last_full_crawl >= FULL_CRAWL_INTERVAL_SECONDS
+
+    def all_seen(self, urls):
+        """True if `urls` is non-empty and every one was seen before (the crawl caught up)."""
+        urls = [url for url in urls if url]
+        return bool(urls) and all(url in self.seen for url in urls)
+
+    def record(self, entries, full_crawl):
+        """
+        Marks `entries` as seen and returns the listing to publish.
+        A full crawl replaces the stored listing. An incremental crawl puts its (new) entries in
+        front of the previous listing, capped at the previous listing's size, so consumers still
+        get a complete listing.
+        """
+        now = time.time()
+        new_count = 0
+        for entry in entries:
+            url = entry.get("url")
+            if url and url not in self.seen:
+                self.seen[url] = now
+                new_count += 1
+        while len(self.seen) > MAX_SEEN_URLS:
+            del self.seen[next(iter(self.seen))]
+
+        if full_crawl:
+            self.items = list(entries)
+            self.last_full_crawl = now
+        else:
+            fresh_urls = {entry.get("url") for entry in entries}
+            carried = [item for item in self.items if item.get("url") not in fresh_urls]
+            limit = max(len(self.items), len(entries))
+            self.items = (list(entries) + carried)[:limit]
+        return list(self.items), new_count
+
+    def to_dict(self):
+        return {
+            "seen": self.seen,
+            "items": self.items,
+            "last_full_crawl": self.last_full_crawl,
+        }
+
+
+class WatermarkStore:
+    """Per-source watermarks persisted in the SQLite NewsStore after each scrape."""
+
+    def __init__(self, store, legacy_path=WATERMARKS_PATH):
+        self.store = store
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._watermarks = {}
+        self._load()
+
+    def _load(self):
+        try:
+            stored = self.store.load_watermarks()
+            origin = "the store"
+            if not stored and os.path.exists(self.legacy_path):
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                origin = self.legacy_path
+            # Older states also carry "last_new_item_at", which is no longer tracked
+            self._watermarks = {source: SourceWatermark(**{key: value for key, value in data.items() if key != "last_new_item_at"})
+                                for source, data in stored.items()}
+            if self._watermarks:
+                logging.info(f"Watermarks: loaded {len(self._watermarks)} sources from {origin}.")
+        except (OSError, sqlite3.Error, ValueError, TypeError) as e:
+            logging.warning(f"Watermarks: could not load, every source starts cold: {e}")
+
+    def get(self, source):
+        with self._lock:
+            return self._watermarks.setdefault(source, SourceWatermark())
+
+    def save(self):
+        with self._lock:
+            payload = {source: watermark.to_dict() for source, watermark in self._watermarks.items()}
+        try:
+            self.store.save_watermarks(payload)
+        except sqlite3.Error as e:
+            logging.error(f"Watermarks: failed to save: {e}")
+
+
+_watermark_store = None
+_watermark_store_lock = threading.Lock()
+
+
+def get_watermark_store():
+    """Returns the process-wide WatermarkStore, loading it on first use."""
+    global _watermark_store
+    with _watermark_store_lock:
+        if _watermark_store is None:
+            _watermark_store = WatermarkStore(get_news_store())
+        return _watermark_store